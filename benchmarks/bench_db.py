@@ -0,0 +1,119 @@
+# ==========================================
+# BENCHMARK WARSTWY BAZY (TysiacDB)
+# ==========================================
+# Odczyty na gotowym archiwum i zapis meczu rozdanie po rozdaniu.
+# Zapisy idą do kopii bazy - wygenerowane archiwum zostaje nietknięte.
+import os
+import time
+import random
+import shutil
+
+from common import measure, summarize
+from synthetic import random_deal
+from tysiac_engine import Match
+
+# Długości meczu (numer rozdania), dla których raportujemy czas zapisu
+MATCH_LENGTHS = (1, 5, 10, 20, 40)
+
+
+def copy_archive(path, work_dir):
+    work_path = os.path.join(work_dir, "work_" + os.path.basename(path))
+    shutil.copyfile(path, work_path)
+    return work_path
+
+
+def rewrite_match(db, match_id, game_log):
+    # Dawny zapis meczu (przed append_rounds): wszystkie rozdania usuwane i wstawiane od nowa.
+    # Trzyma statystyki w zgodzie jak tamta droga, żeby delete_match po pomiarze je wycofał.
+    date_str = time.strftime("%Y-%m-%d %H:%M:%S")
+    now_ts = int(time.time())
+    with db.transaction() as cursor:
+        if match_id is None:
+            cursor.execute("""
+                INSERT INTO matches (uid, date, status, started_at, ended_at) VALUES (?, ?, 'paused', ?, ?)
+            """, (db.new_match_uid(), date_str, now_ts, now_ts))
+            match_id = cursor.lastrowid
+        else:
+            db._retract_match_stats(cursor, match_id)
+            cursor.execute("UPDATE matches SET date = ?, content_hash = NULL, ended_at = ? WHERE id = ?",
+                           (date_str, now_ts, match_id))
+            cursor.execute("DELETE FROM rounds WHERE match_id = ?", (match_id,))
+        rows = db._round_rows(game_log)
+        db._add_round_stats(cursor, rows, date_str)
+        cursor.executemany("""
+            INSERT INTO rounds (match_id, round_number, player_name, score_change,
+                                meld_40, meld_60, meld_80, meld_100,
+                                is_declaration, declared_points)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(match_id,) + row for row in rows])
+        db._apply_daily(cursor, "m.id = ?", (match_id,), 1)
+        db._rebuild_match_summary(cursor, match_id)
+    return match_id
+
+
+def bench_reads(db, repeat, rng):
+    cursor = db.conn.cursor()
+    finished = [row[0] for row in cursor.execute("SELECT id FROM matches WHERE status = 'finished'")] or [0]
+    today = cursor.execute("SELECT " + db.day_sql("strftime('%s', 'now')")).fetchone()[0]
+    return {
+        'get_paused_games_page': measure(db.get_paused_games_page, repeat),
+        'get_top_wins': measure(db.get_top_wins, repeat),
+        'get_top_total_melds': measure(db.get_top_total_melds, repeat),
+        'get_top_100_melds': measure(db.get_top_100_melds, repeat),
+        'get_top_ratings': measure(db.get_top_ratings, repeat),
+        'get_leaderboards_30d': measure(lambda: db.get_leaderboards((today - 29, today)), repeat),
+        'get_leaderboards_365d': measure(lambda: db.get_leaderboards((today - 364, today)), repeat),
+        'get_head_to_head': measure(db.get_head_to_head, repeat),
+        'get_history_page': measure(db.get_history_page, repeat),
+        'get_history_page_by_date': measure(lambda: db.get_history_page(sort_column=1), repeat),
+        'get_match_details': measure(lambda: db.get_match_details(rng.choice(finished)), repeat),
+        'get_match_summary': measure(lambda: db.get_match_summary(rng.choice(finished)), repeat),
+    }
+
+
+def bench_writes(db, matches, rng):
+    # Ten sam mecz zapisywany dwiema drogami: pełny zapis (rewrite_match, dawna droga)
+    # i dopisywanie rozdania (append_rounds, używane przez GameWidget)
+    timings = {'rewrite_match': {}, 'append_rounds': {}}
+    created = []
+    for _ in range(matches):
+        match = Match(rng.sample(["A", "B", "C"], 3))
+        save_id = append_id = None
+        for round_number in range(1, max(MATCH_LENGTHS) + 1):
+            # Zerowanie sum: mecz ma dojść do ostatniego mierzonego rozdania bez zwycięzcy
+            match.scores = [0] * len(match.players)
+            match.play(random_deal(rng, len(match.players)))
+
+            t0 = time.perf_counter()
+            save_id = rewrite_match(db, save_id, match.log)
+            t1 = time.perf_counter()
+            append_id = db.append_rounds(append_id, match.log.snapshot(-len(match.players)))
+            t2 = time.perf_counter()
+            if round_number in MATCH_LENGTHS:
+                timings['rewrite_match'].setdefault(round_number, []).append(t1 - t0)
+                timings['append_rounds'].setdefault(round_number, []).append(t2 - t1)
+        created.extend((save_id, append_id))
+    for match_id in created:
+        db.delete_match(match_id)
+    return {method: {f"deal_{n:02d}": summarize(samples) for n, samples in sorted(per_len.items())}
+            for method, per_len in timings.items()}
+
+
+def run(archive_path, work_dir, repeat=20, write_matches=5, seed=1, profile=None):
+    import tysiac
+
+    rng = random.Random(seed)
+    work_path = copy_archive(archive_path, work_dir)
+    try:
+        t0 = time.perf_counter()
+        db = tysiac.TysiacDB(work_path, profile)
+        open_ms = (time.perf_counter() - t0) * 1000
+        results = {'open_ms': round(open_ms, 4), 'profile': db.profile}
+        results['reads'] = bench_reads(db, repeat, rng)
+        results['writes'] = bench_writes(db, write_matches, rng)
+        db.conn.close()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(work_path + suffix):
+                os.remove(work_path + suffix)
+    return results
@@ -0,0 +1,119 @@
+# ==========================================
+# BENCHMARK GUI (offscreen)
+# ==========================================
+# GameWidget.process_round i MenuWidget.refresh_data na prawdziwych widgetach
+# (QT_QPA_PLATFORM=offscreen). Mierzymy część w wątku GUI oraz czas do zapisania
+# / wczytania wszystkiego przez wątek bazy. ScoreChart: wykres kariery - rysowanie od nowa
+# (LTTB + QPainter) i ponowne wyświetlenie z QPixmapCache.
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from common import summarize  # noqa: E402
+
+DEALS_PER_GAME = 10
+PLAYERS = ["Ania", "Bartek", "Celina"]
+# Punkty z kart wpisywane w pola - małe, żeby nikt nie dobił do 1000
+CARD_INPUTS = ("20", "30", "40")
+
+
+def wait_for_db(app, db):
+    from PySide6.QtCore import QEventLoop
+    loop = QEventLoop()
+    db.when_idle(loop.quit)
+    loop.exec()
+    app.processEvents()
+
+
+def bench_process_round(app, db, deals, work_dir):
+    import tysiac
+    from tysiac_journal import DealJournal
+
+    # Z dziennikiem rozdań, jak w aplikacji
+    journal = DealJournal(os.path.join(work_dir, "bench.journal"))
+    game = tysiac.GameWidget(None, db, journal)
+    gui_samples, saved_samples = [], []
+    for i in range(deals):
+        if i % DEALS_PER_GAME == 0:
+            game.initialize_game(PLAYERS)
+        for inp, text in zip(game.input_widgets, CARD_INPUTS):
+            inp.score_input.setText(text)
+        t0 = time.perf_counter()
+        game.process_round()
+        t1 = time.perf_counter()
+        wait_for_db(app, db)
+        t2 = time.perf_counter()
+        gui_samples.append(t1 - t0)
+        saved_samples.append(t2 - t0)
+    game.deleteLater()
+    journal.clear()
+    return {'gui_thread': summarize(gui_samples), 'until_saved': summarize(saved_samples)}
+
+
+def bench_refresh_data(app, db, repeat):
+    import tysiac
+
+    menu = tysiac.MenuWidget(None, db)
+    gui_samples, loaded_samples = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        menu.refresh_data()
+        # Widok archiwum dociąga pierwszą stronę sam - tutaj robimy to ręcznie
+        if menu.archive_model.canFetchMore():
+            menu.archive_model.fetchMore()
+        t1 = time.perf_counter()
+        wait_for_db(app, db)
+        t2 = time.perf_counter()
+        gui_samples.append(t1 - t0)
+        loaded_samples.append(t2 - t0)
+    menu.deleteLater()
+    return {'gui_thread': summarize(gui_samples), 'until_loaded': summarize(loaded_samples)}
+
+
+def bench_career_chart(app, work_path, repeat):
+    import tysiac
+    from tysiac_chart import running_totals
+
+    # Najczęściej grający gracz - najdłuższa seria w archiwum
+    db = tysiac.TysiacDB(work_path)
+    players = db.get_head_to_head()['players']
+    points = db.get_player_career(players[0][0]) if players else []
+    db.conn.close()
+    chart = tysiac.ScoreChart("Mecz")
+    chart.resize(800, 300)
+    render_samples, cached_samples = [], []
+    for _ in range(repeat):
+        chart.set_series([("kariera", running_totals(points))])
+        t0 = time.perf_counter()
+        chart.grab()
+        t1 = time.perf_counter()
+        chart.grab()
+        t2 = time.perf_counter()
+        render_samples.append(t1 - t0)
+        cached_samples.append(t2 - t1)
+    chart.deleteLater()
+    return {'matches': len(points), 'render': summarize(render_samples), 'cached': summarize(cached_samples)}
+
+
+def run(archive_path, work_dir, repeat=20, profile=None):
+    from PySide6.QtWidgets import QApplication
+    import tysiac
+    from bench_db import copy_archive
+
+    app = QApplication.instance() or QApplication([])
+    work_path = copy_archive(archive_path, work_dir)
+    db = tysiac.DBExecutor(work_path, profile)
+    try:
+        wait_for_db(app, db)
+        results = {
+            'process_round': bench_process_round(app, db, repeat, work_dir),
+            'refresh_data': bench_refresh_data(app, db, repeat),
+            'career_chart': bench_career_chart(app, work_path, repeat),
+        }
+    finally:
+        db.shutdown()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(work_path + suffix):
+                os.remove(work_path + suffix)
+    return results
@@ -0,0 +1,77 @@
+# ==========================================
+# BENCHMARKI - WSPÓLNE NARZĘDZIA
+# ==========================================
+# Pomiar czasu (min/mediana/średnia/p95) i zapis wyników do JSON,
+# żeby można było porównać dwie wersje aplikacji (compare.py).
+import os
+import sys
+import json
+import time
+import sqlite3
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    ms = lambda seconds: round(seconds * 1000, 4)
+    return {
+        'runs': len(ordered),
+        'min_ms': ms(ordered[0]),
+        'median_ms': ms(statistics.median(ordered)),
+        'mean_ms': ms(statistics.fmean(ordered)),
+        'p95_ms': ms(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]),
+        'max_ms': ms(ordered[-1]),
+    }
+
+
+def measure(fn, repeat=20, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment(app_version=None):
+    return {
+        'app_version': app_version,
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def write_results(path, results, params, app_version=None):
+    data = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(app_version),
+        'params': params,
+        'results': results,
+    }
+    if path == "-":
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,56 @@
+# ==========================================
+# PORÓWNANIE DWÓCH WYNIKÓW BENCHMARKÓW
+# ==========================================
+# python benchmarks/compare.py stare.json nowe.json [--threshold 20]
+# Porównuje mediany; kod wyjścia 1, gdy któryś pomiar zwolnił o więcej niż próg (%).
+import sys
+import json
+import argparse
+
+
+def flatten(node, prefix=""):
+    # Liście z "median_ms" -> {"10000/db/reads/get_top_wins": mediana}
+    if isinstance(node, dict):
+        if "median_ms" in node:
+            return {prefix: node["median_ms"]}
+        flat = {}
+        for key, value in node.items():
+            flat.update(flatten(value, f"{prefix}/{key}" if prefix else str(key)))
+        return flat
+    return {}
+
+
+def compare(old, new, threshold):
+    old_flat = flatten(old["results"])
+    new_flat = flatten(new["results"])
+    rows = []
+    for name in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[name], new_flat[name]
+        change = (after - before) / before * 100 if before > 0 else 0.0
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Porównanie wyników benchmarków (mediany)")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=20.0, help="próg regresji w procentach")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding="utf-8") as f: old = json.load(f)
+    with open(args.new, encoding="utf-8") as f: new = json.load(f)
+    rows = compare(old, new, args.threshold)
+
+    width = max((len(row[0]) for row in rows), default=10)
+    regressions = 0
+    for name, before, after, change, regressed in rows:
+        mark = "  <-- REGRESJA" if regressed else ""
+        print(f"{name:<{width}}  {before:>10.3f} ms  {after:>10.3f} ms  {change:+7.1f}%{mark}")
+        regressions += regressed
+    print(f"Porównano pomiarów: {len(rows)}, regresji powyżej {args.threshold:.0f}%: {regressions}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
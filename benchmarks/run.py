@@ -0,0 +1,58 @@
+# ==========================================
+# URUCHAMIANIE BENCHMARKÓW
+# ==========================================
+# python benchmarks/run.py --rounds 10000 100000 1000000 --out wyniki.json
+# Archiwa są generowane raz (katalog --db-dir) i używane ponownie przy kolejnych
+# uruchomieniach, więc wyniki dwóch wersji aplikacji liczone są na tych samych danych.
+import os
+import sys
+import argparse
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import bench_db  # noqa: E402
+from common import write_results  # noqa: E402
+from synthetic import generate_archive  # noqa: E402
+
+
+def archive_path(db_dir, rounds, seed):
+    return os.path.join(db_dir, f"tysiac_bench_{rounds}_s{seed}.db")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki Tysiąc Managera")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10000, 100000],
+                        help="rozmiary archiwów (wiersze w tabeli rounds)")
+    parser.add_argument("--db-dir", default=os.path.join(tempfile.gettempdir(), "tysiac_bench"),
+                        help="katalog na wygenerowane archiwa")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=20, help="powtórzeń każdego pomiaru")
+    parser.add_argument("--write-matches", type=int, default=5, help="meczów w teście zapisu")
+    parser.add_argument("--profile", default=None, help="profil bazy (TYSIAC_DB_PROFILE)")
+    parser.add_argument("--no-gui", action="store_true", help="pomiń benchmark widgetów")
+    parser.add_argument("--out", default="-", help="plik JSON z wynikami (domyślnie stdout)")
+    args = parser.parse_args(argv)
+
+    import tysiac
+
+    os.makedirs(args.db_dir, exist_ok=True)
+    results = {}
+    for rounds in args.rounds:
+        path = archive_path(args.db_dir, rounds, args.seed)
+        if not os.path.exists(path):
+            generate_archive(path, rounds, args.seed)
+        print(f"Pomiar: {os.path.basename(path)}", file=sys.stderr)
+        entry = {'db': bench_db.run(path, args.db_dir, args.repeat, args.write_matches, args.seed, args.profile)}
+        if not args.no_gui:
+            import bench_gui
+            entry['gui'] = bench_gui.run(path, args.db_dir, args.repeat, args.profile)
+        results[str(rounds)] = entry
+
+    params = {key: value for key, value in vars(args).items() if key != "out"}
+    write_results(args.out, results, params, tysiac.APP_VERSION)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
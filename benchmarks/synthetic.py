@@ -0,0 +1,117 @@
+# ==========================================
+# GENERATOR SYNTETYCZNEGO ARCHIWUM (tysiac.db)
+# ==========================================
+# Uruchomienie: python benchmarks/synthetic.py --rounds 100000 --out /tmp/tysiac_bench.db
+# Mecze są rozgrywane przez tysiac_engine (te same zasady co w GameWidget), więc sumy,
+# zwycięzcy i "pod kreską" wyglądają jak w prawdziwej bazie. --rounds liczy wiersze tabeli rounds.
+import os
+import sys
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from common import REPO_DIR  # noqa: F401 (ścieżka do modułów aplikacji)
+from tysiac_engine import MELD_SUITS, NO_MELDS, DealEntry, Match, meld_points
+
+PLAYER_POOL = ["Ania", "Bartek", "Celina", "Darek", "Ewa", "Franek", "Gosia", "Henryk",
+               "Iza", "Janek", "Kasia", "Leszek", "Marta", "Norbert", "Ola", "Piotr",
+               "Renata", "Staszek", "Tomek", "Ula", "Wojtek", "Zosia", "Babcia", "Dziadek"]
+# Liczba graczy w meczu: najczęściej 3, jak w klasycznym Tysiącu
+PLAYER_COUNTS = (2, 3, 3, 3, 4)
+# Szansa, że dany meldunek pojawi się w rozdaniu (u jednego gracza)
+MELD_PROBABILITY = {'40': 0.22, '60': 0.18, '80': 0.15, '100': 0.12}
+DECLARATION_RATE = 0.35
+DECLARED_POINTS = (100,) * 6 + (110,) * 4 + (120,) * 3 + (130, 140, 150, 160, 180, 200)
+PAUSED_RATE = 0.05
+MAX_ROUNDS = 80
+CARD_POINTS = 120
+
+
+def random_deal(rng, player_count):
+    melds = [dict(NO_MELDS) for _ in range(player_count)]
+    for suit in MELD_SUITS:
+        if rng.random() < MELD_PROBABILITY[suit]:
+            melds[rng.randrange(player_count)][suit] = 1
+    # 120 punktów w kartach dzielone losowo między graczy
+    cuts = sorted(rng.randint(0, CARD_POINTS) for _ in range(player_count - 1))
+    cards = [b - a for a, b in zip([0] + cuts, cuts + [CARD_POINTS])]
+    entries = [DealEntry(None, c, m) for c, m in zip(cards, melds)]
+    if rng.random() < DECLARATION_RATE:
+        # Licytację zwykle wygrywa ktoś z mocną ręką, ale nie zawsze trafnie
+        idx = max(range(player_count), key=lambda i: cards[i] + meld_points(melds[i]) + rng.randint(-40, 40))
+        entries[idx].is_declaration = True
+        entries[idx].declared_points = rng.choice(DECLARED_POINTS)
+    return entries
+
+
+def random_match(rng):
+    players = rng.sample(PLAYER_POOL, rng.choice(PLAYER_COUNTS))
+    match = Match(players, rng.randrange(len(players)))
+    paused_at = rng.randint(1, 20) if rng.random() < PAUSED_RATE else None
+    while match.winner is None and match.round_number <= MAX_ROUNDS:
+        match.play(random_deal(rng, len(players)))
+        if paused_at is not None and match.round_number > paused_at:
+            break
+    if paused_at is not None and match.winner is None:
+        return match, 'paused', None
+    return match, 'finished', match.winner or match.leader()
+
+
+def generate_archive(path, rounds, seed=1, out=sys.stderr):
+    import tysiac
+
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    rng = random.Random(seed)
+    db = tysiac.TysiacDB(os.path.abspath(path), profile="fast")
+    now = datetime.now().replace(microsecond=0)
+    matches = []
+    rows_total = 0
+    while rows_total < rounds:
+        match, status, winner = random_match(rng)
+        matches.append((match, status, winner))
+        rows_total += len(match.log)
+
+    # Daty rosną z numerem meczu, rozłożone na ostatnie 3 lata
+    span = timedelta(days=3 * 365)
+    durations = []
+    with db.transaction() as cursor:
+        for i, (match, status, winner) in enumerate(matches):
+            date = now - span + span * (i + 1) / len(matches)
+            date_str = date.strftime("%Y-%m-%d %H:%M:%S")
+            cursor.execute("""
+                INSERT INTO matches (uid, date, winner, status, initial_dealer_offset) VALUES (?, ?, ?, ?, ?)
+            """, (db.new_match_uid(date_str), date_str, winner, status, match.dealer_offset))
+            match_id = cursor.lastrowid
+            cursor.executemany("""
+                INSERT INTO rounds (match_id, round_number, player_name, score_change,
+                                    meld_40, meld_60, meld_80, meld_100,
+                                    is_declaration, declared_points)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(match_id,) + row for row in match.log.rows()])
+            durations.append((len(match.sheet) * rng.randint(150, 420), match_id))
+    db.rebuild_player_stats()
+    db.rebuild_match_summaries()
+    db.rebuild_ratings()
+    with db.transaction() as cursor:
+        cursor.executemany("UPDATE matches SET duration_seconds = ? WHERE id = ?", durations)
+    db.rebuild_player_daily()
+    db.rebuild_head_to_head()
+    db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.conn.close()
+    print(f"Wygenerowano {path}: meczów {len(matches)}, rozdań (wierszy) {rows_total}", file=out)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Syntetyczne archiwum Tysiąca do benchmarków")
+    parser.add_argument("--rounds", type=int, default=100000, help="liczba wierszy w tabeli rounds")
+    parser.add_argument("--out", required=True, help="ścieżka nowej bazy")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    generate_archive(args.out, args.rounds, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# Nieudany import archiwum nie może zostawić bazy bez indeksów
+import os
+import tempfile
+import unittest
+
+try:
+    import PySide6  # noqa: F401
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+
+@unittest.skipUnless(HAS_QT, "wymaga PySide6")
+class ImportArchiveTest(unittest.TestCase):
+    def test_truncated_file_leaves_schema_unchanged(self):
+        import tysiac
+        import tysiac_archive
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "source.db")
+            db = tysiac.TysiacDB(source)
+            deal = [{'round': 1, 'player': name, 'score': score} for name, score in (("Ala", 120), ("Bob", 40))]
+            for _ in range(3):
+                db.set_match_status(db.append_rounds(None, deal), "finished", "Ala")
+            db.conn.close()
+            archive = os.path.join(tmp, "archiwum.bin")
+            tysiac_archive.export_archive(source, archive)
+            with open(archive, "rb+") as f:
+                f.truncate(os.path.getsize(archive) - 8)
+
+            db = tysiac.TysiacDB(os.path.join(tmp, "tysiac.db"))
+            schema = sorted(db.conn.execute("SELECT type, name, sql FROM sqlite_master"))
+            with self.assertRaises(ValueError):
+                tysiac_archive.import_archive(db, archive)
+            self.assertEqual(sorted(db.conn.execute("SELECT type, name, sql FROM sqlite_master")), schema)
+            self.assertEqual(db.check_query_plans(), [])
+            db.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# Scalanie tej samej starej bazy (sprzed uid) drugi raz nie może dublować meczów
+import os
+import sqlite3
+import tempfile
+import unittest
+
+try:
+    import PySide6  # noqa: F401
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+
+def make_v5_database(path, tysiac):
+    db = tysiac.TysiacDB(path)
+    for scores in ((120, 40), (60, 100), (120, 40)):
+        deal = [{'round': 1, 'player': name, 'score': score} for name, score in zip(("Ala", "Bob"), scores)]
+        db.set_match_status(db.append_rounds(None, deal), "finished", "Ala")
+    db.conn.close()
+    # Cofnięcie do schematu 5: bez uid i skrótu zawartości
+    conn = sqlite3.connect(path)
+    conn.execute("DROP INDEX idx_matches_uid")
+    conn.execute("ALTER TABLE matches DROP COLUMN uid")
+    conn.execute("ALTER TABLE matches DROP COLUMN content_hash")
+    conn.execute("PRAGMA user_version = 5")
+    conn.commit()
+    conn.close()
+
+
+@unittest.skipUnless(HAS_QT, "wymaga PySide6")
+class MergeLegacySourceTest(unittest.TestCase):
+    def test_same_v5_source_merged_twice(self):
+        import tysiac
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "stara.db")
+            make_v5_database(source, tysiac)
+            db = tysiac.TysiacDB(os.path.join(tmp, "tysiac.db"))
+            self.assertEqual(db.merge_from(source), (3, 0, 0))
+            self.assertEqual(db.merge_from(source), (0, 0, 0))
+            self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0], 3)
+            db.conn.close()
+
+    def test_legacy_matches_with_different_uids(self):
+        import tysiac
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "stara.db")
+            make_v5_database(source, tysiac)
+            # Kopia zmigrowana wcześniej z losowymi uid - te same mecze rozpoznane po dacie i zawartości
+            path = os.path.join(tmp, "tysiac.db")
+            with open(source, "rb") as f, open(path, "wb") as out:
+                out.write(f.read())
+            db = tysiac.TysiacDB(path)
+            rows = db.conn.execute("SELECT id, date FROM matches").fetchall()
+            db.conn.executemany("UPDATE matches SET uid = ? WHERE id = ?",
+                                [(db.new_match_uid(date), match_id) for match_id, date in rows])
+            db.conn.commit()
+            self.assertEqual(db.merge_from(source), (0, 0, 0))
+            self.assertEqual(db.conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0], 3)
+            db.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# Ranking Elo liczony przyrostowo musi się zgadzać z pełnym przeliczeniem
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import PySide6  # noqa: F401
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+
+@unittest.skipUnless(HAS_QT, "wymaga PySide6")
+class IncrementalRatingsTest(unittest.TestCase):
+    def test_match_finished_in_the_same_second_as_a_later_one(self):
+        import tysiac
+        from datetime import datetime
+
+        frozen = datetime(2024, 5, 1, 20, 0, 0)
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(tysiac, "datetime") as fake:
+            fake.now.return_value = frozen
+            fake.strptime = datetime.strptime
+            db = tysiac.TysiacDB(os.path.join(tmp, "tysiac.db"))
+            deal = [{'round': 1, 'player': name, 'score': score} for name, score in (("Ala", 120), ("Bob", 40))]
+            first = db.append_rounds(None, deal)
+            second = db.append_rounds(None, deal)
+            # Późniejszy mecz kończy się pierwszy, wcześniejszy w tej samej sekundzie
+            db.set_match_status(second, "finished", "Ala")
+            db.set_match_status(first, "finished", "Bob")
+            incremental = sorted(db.conn.execute("SELECT player_name, rating, games FROM player_ratings"))
+            db.rebuild_ratings()
+            rebuilt = sorted(db.conn.execute("SELECT player_name, rating, games FROM player_ratings"))
+            self.assertEqual(incremental, rebuilt)
+            self.assertEqual([games for _, _, games in rebuilt], [2, 2])
+            db.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
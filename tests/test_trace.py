@@ -0,0 +1,35 @@
+# Tryb pomiarów (--trace): opakowane metody TysiacDB, w tym staticmethod, muszą działać jak bez pomiarów
+import os
+import atexit
+import tempfile
+import unittest
+
+try:
+    import PySide6  # noqa: F401
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+
+@unittest.skipUnless(HAS_QT, "wymaga PySide6")
+class TraceModeTest(unittest.TestCase):
+    def test_save_and_finish_match_with_tracing(self):
+        import tysiac
+        from tysiac_trace import TRACER
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tysiac.install_tracing(os.path.join(tmp, "trace.json"))
+            db = tysiac.TysiacDB(os.path.join(tmp, "tysiac.db"))
+            deal = [{'round': 1, 'player': name, 'score': score} for name, score in (("Ala", 120), ("Bob", 40))]
+            match_id = db.append_rounds(None, deal)
+            db.set_match_status(match_id, "finished", "Ala")
+            self.assertEqual(db.get_top_wins(), [("Ala", 1)])
+            self.assertEqual(len(db.new_match_uid()), 26)
+            self.assertIn("TysiacDB.append_rounds", TRACER.last)
+            db.conn.close()
+            self.assertTrue(os.path.exists(TRACER.save()))
+            atexit.unregister(TRACER.save)  # katalog tymczasowy znika przed końcem procesu
+
+
+if __name__ == "__main__":
+    unittest.main()
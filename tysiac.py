@@ -1,22 +1,102 @@
+import time
+# Początek pomiaru dla --profile-startup (przed ciężkimi importami Qt)
+STARTUP_T0 = time.perf_counter()
 import sys
 import sqlite3
+from contextlib import contextmanager
 import random
 import os
+import queue
+import json
+import hashlib
+import itertools
+import shutil
+import tempfile
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QLabel, QLineEdit, QPushButton,
                                QTreeWidget, QTreeWidgetItem, QMessageBox,
                                QComboBox, QGroupBox, QGridLayout, QCheckBox,
                                QTabWidget, QScrollArea, QStackedWidget, QHeaderView,
-                               QDialog, QFrame, QStatusBar)
-from PySide6.QtCore import Qt, QRegularExpression, QSize
-from PySide6.QtGui import QFont, QColor, QRegularExpressionValidator, QIcon
+                               QDialog, QFrame, QStatusBar, QTreeView, QDateEdit,
+                               QCompleter, QTableView)
+from PySide6.QtCore import (Qt, QRegularExpression, QSize, QAbstractTableModel,
+                            QModelIndex, QDate, QObject, QThread, Signal, QTimer,
+                            QStringListModel, QPointF, QRectF)
+from PySide6.QtGui import (QFont, QColor, QRegularExpressionValidator, QIcon, QImage,
+                           QPainter, QPixmap, QPixmapCache, QPen, QPolygonF)
+from tysiac_engine import Match, DealEntry, GameLog, ScoreSheet, NO_MELDS, WIN_SCORE, meld_holders
+from tysiac_trace import TRACER
+from tysiac_journal import DealJournal
+from tysiac_rating import apply_match, standings
+from tysiac_chart import lttb, running_totals
 
 basedir = os.path.dirname(__file__)
 icon_path = os.path.join(basedir, "tysiac.png")
 # --- KONFIGURACJA APLIKACJI ---
 APP_VERSION = "0.9.1"
+# Maksymalny czas jednego rozdania wliczany do czasu gry (dłuższa przerwa = pauza)
+DEAL_GAP_LIMIT = 20 * 60
+# Okresy rankingów w menu (liczba dni wstecz, łącznie z dzisiejszym)
+RANKING_WINDOWS = ((7, "Ostatnie 7 dni"), (30, "Ostatnie 30 dni"), (365, "Ostatni rok"))
+# Wersja schematu bazy (PRAGMA user_version)
+DB_SCHEMA_VERSION = 11
+# Co ile policzonych meczów zapisywany jest punkt kontrolny rankingu Elo
+RATING_CHECKPOINT_EVERY = 100
+# Alfabet Crockforda dla identyfikatorów meczów (ULID: 48 bitów czasu w ms + 80 bitów losowych)
+ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Separator imion w kluczu składu stołu (tabela lineup_stats)
+LINEUP_SEP = "\x1f"
+
+# Profile trwałości bazy (PRAGMA), wybór: TYSIAC_DB_PROFILE=safe|balanced|fast|legacy
+# "balanced" - WAL + synchronous=NORMAL: odczyty statystyk nie blokują zapisu rozdania,
+# a przy awarii zasilania można stracić co najwyżej ostatnie zatwierdzenia (baza pozostaje spójna).
+DB_PROFILES = {
+    'safe':     {'journal_mode': 'WAL', 'synchronous': 'FULL', 'cache_size': -16000,
+                 'mmap_size': 0, 'temp_store': 'MEMORY'},
+    'balanced': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'cache_size': -16000,
+                 'mmap_size': 64 * 1024 * 1024, 'temp_store': 'MEMORY'},
+    'fast':     {'journal_mode': 'WAL', 'synchronous': 'OFF', 'cache_size': -64000,
+                 'mmap_size': 256 * 1024 * 1024, 'temp_store': 'MEMORY'},
+    'legacy':   {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+}
+DEFAULT_DB_PROFILE = "balanced"
+
+# Przeskalowane kopie ikony (tysiac.png ma ~1.4 MB - dekodujemy ją tylko raz)
+ICON_SIZES = (16, 24, 32, 48, 64, 128, 256)
+
+# Wszystkie stany wyglądu zdefiniowane raz - widgety przełączają je dynamicznymi właściwościami
+APP_STYLESHEET = """
+    QWidget { font-size: 12pt; }
+    QTreeWidget { font-size: 14px; }
+    QTreeWidget::item { padding: 5px; }
+    QHeaderView::section { font-size: 14px; font-weight: bold; }
+    QPushButton { font-size: 13px; }
+    QLineEdit { font-size: 14px; }
+    QGroupBox { font-weight: bold; }
+
+    QGroupBox[role="score_card"] { border: 2px solid gray; border-radius: 5px; margin-top: 1ex; }
+    QGroupBox[role="score_card"][dealer="true"] { border: 2px solid #FFD700; background-color: rgba(255, 215, 0, 0.1); }
+    QGroupBox[role="score_card"]::title { subcontrol-origin: margin; subcontrol-position: top center; padding: 0 3px; }
+    QLabel[role="name_label"] { font-size: 22px; font-weight: bold; }
+    QLabel[role="score_label"] { font-size: 70px; font-weight: bold; color: #2196F3; }
+    QLabel[role="score_label"][underLine="true"] { color: #F44336; }
+    QLabel[role="status_label"] { color: #F44336; }
+    QLabel[role="odds_label"] { color: gray; font-size: 13px; }
+
+    QFrame[role="summary_frame"] { border: 1px solid gray; border-radius: 8px; }
+    QFrame[role="summary_frame"][winner="true"] { background-color: #1a1a1a; border: 2px solid #d4af37; }
+    QLabel[role="summary_name"] { font-size: 14px; }
+    QLabel[role="summary_name"][winner="true"] { color: #d4af37; font-weight: bold; font-size: 16px; }
+    QLabel[role="summary_total"] { font-size: 20px; font-weight: bold; }
+    QLabel[role="summary_total"][winner="true"] { color: #d4af37; font-size: 24px; }
+"""
+
+# Licznik ponownych polerowań stylu (TYSIAC_STYLE_DEBUG=1 pokazuje go po każdym rozdaniu)
+STYLE_DEBUG = os.environ.get("TYSIAC_STYLE_DEBUG") == "1"
+# Pomiary czasu (tysiac_trace): --trace / TYSIAC_TRACE=1|ścieżka, nakładka w pasku stanu: --trace-overlay
+TRACE_OVERLAY = "--trace-overlay" in sys.argv or os.environ.get("TYSIAC_TRACE_OVERLAY") == "1"
 
 try:
     import qdarktheme
@@ -28,14 +108,39 @@ except ImportError:
 # BAZA DANYCH
 # ==========================================
 class TysiacDB:
-    def __init__(self, db_name="tysiac.db"):
+    def __init__(self, db_name="tysiac.db", profile=None):
         user_dir = os.path.expanduser("~/Tysiac_Manager")
         Path(user_dir).mkdir(parents=True, exist_ok=True)
         self.db_path = os.path.join(user_dir, db_name)
-        self.conn = sqlite3.connect(self.db_path)
+        # URI: ATTACH innej bazy tylko do odczytu (scalanie) niezależnie od opcji kompilacji SQLite
+        self.conn = sqlite3.connect(Path(self.db_path).as_uri(), uri=True)
+        TRACER.watch_connection(self.conn)
+        self._tx_depth = 0
+        self.apply_profile(profile or os.environ.get("TYSIAC_DB_PROFILE", DEFAULT_DB_PROFILE))
         self.create_tables()
         self.update_schema()
 
+    def apply_profile(self, profile):
+        if profile not in DB_PROFILES:
+            raise ValueError(f"Nieznany profil bazy: {profile} (dostępne: {', '.join(DB_PROFILES)})")
+        self.profile = profile
+        for pragma, value in DB_PROFILES[profile].items():
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
+
+    @contextmanager
+    def transaction(self):
+        # Jednostka pracy: wszystkie operacje w bloku = jeden commit (jeden fsync).
+        # Zagnieżdżone bloki dołączają do zewnętrznej transakcji.
+        self._tx_depth += 1
+        try:
+            yield self.conn.cursor()
+        except BaseException:
+            self._tx_depth -= 1
+            if self._tx_depth == 0: self.conn.rollback()
+            raise
+        self._tx_depth -= 1
+        if self._tx_depth == 0: self.conn.commit()
+
     def create_tables(self):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -66,134 +171,1049 @@ class TysiacDB:
         self.conn.commit()
 
     def update_schema(self):
+        with self.transaction() as cursor:
+            # Aktualizacja dla starych baz danych
+            try:
+                cursor.execute("SELECT status FROM matches LIMIT 1")
+            except sqlite3.OperationalError:
+                cursor.execute("ALTER TABLE matches ADD COLUMN status TEXT DEFAULT 'finished'")
+
+            try:
+                cursor.execute("SELECT initial_dealer_offset FROM matches LIMIT 1")
+            except sqlite3.OperationalError:
+                cursor.execute("ALTER TABLE matches ADD COLUMN initial_dealer_offset INTEGER DEFAULT 0")
+
+            # Kolumny meldunków
+            try:
+                cursor.execute("SELECT meld_40 FROM rounds LIMIT 1")
+            except sqlite3.OperationalError:
+                cursor.execute("ALTER TABLE rounds ADD COLUMN meld_40 INTEGER DEFAULT 0")
+                cursor.execute("ALTER TABLE rounds ADD COLUMN meld_60 INTEGER DEFAULT 0")
+                cursor.execute("ALTER TABLE rounds ADD COLUMN meld_80 INTEGER DEFAULT 0")
+                cursor.execute("ALTER TABLE rounds ADD COLUMN meld_100 INTEGER DEFAULT 0")
+
+            # NOWE KOLUMNY: DEKLARACJA
+            try:
+                cursor.execute("SELECT is_declaration FROM rounds LIMIT 1")
+            except sqlite3.OperationalError:
+                cursor.execute("ALTER TABLE rounds ADD COLUMN is_declaration INTEGER DEFAULT 0")
+                cursor.execute("ALTER TABLE rounds ADD COLUMN declared_points INTEGER DEFAULT 0")
+
+            # Migracje wersjonowane
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                # v1: indeksy pod wyszukiwanie po meczu, graczu i statusie
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_rounds_match_round ON rounds(match_id, round_number)")
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_rounds_player
+                    ON rounds(player_name, meld_40, meld_60, meld_80, meld_100)
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_status_id ON matches(status, id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_status_winner ON matches(status, winner)")
+            if version < 2:
+                # v2: zmaterializowane statystyki graczy (aktualizowane przyrostowo)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS player_stats (
+                        player_name TEXT PRIMARY KEY,
+                        wins INTEGER DEFAULT 0,
+                        games_played INTEGER DEFAULT 0,
+                        rounds_played INTEGER DEFAULT 0,
+                        total_points INTEGER DEFAULT 0,
+                        meld_40 INTEGER DEFAULT 0,
+                        meld_60 INTEGER DEFAULT 0,
+                        meld_80 INTEGER DEFAULT 0,
+                        meld_100 INTEGER DEFAULT 0,
+                        declarations_made INTEGER DEFAULT 0,
+                        declarations_failed INTEGER DEFAULT 0,
+                        last_played TEXT
+                    )
+                ''')
+                self.rebuild_player_stats()
+            if version < 3:
+                # v3: sortowanie archiwum po dacie
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_status_date ON matches(status, date)")
+            if version < 4:
+                # v4: data ostatniej gry - podpowiedzi graczy z player_stats zamiast skanu rounds
+                try:
+                    cursor.execute("SELECT last_played FROM player_stats LIMIT 1")
+                except sqlite3.OperationalError:
+                    cursor.execute("ALTER TABLE player_stats ADD COLUMN last_played TEXT")
+                cursor.execute("""
+                    UPDATE player_stats SET last_played = (
+                        SELECT MAX(m.date) FROM rounds r JOIN matches m ON m.id = r.match_id
+                        WHERE r.player_name = player_stats.player_name)
+                """)
+            if version < 5:
+                # v5: podsumowanie meczu (sumy graczy, przewaga, liczba rozdań, czas gry)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS match_players (
+                        match_id INTEGER NOT NULL,
+                        player_name TEXT NOT NULL,
+                        seat INTEGER DEFAULT 0,
+                        total_points INTEGER DEFAULT 0,
+                        margin INTEGER DEFAULT 0,
+                        PRIMARY KEY (match_id, player_name)
+                    )
+                ''')
+                try:
+                    cursor.execute("SELECT rounds_count FROM matches LIMIT 1")
+                except sqlite3.OperationalError:
+                    cursor.execute("ALTER TABLE matches ADD COLUMN rounds_count INTEGER DEFAULT 0")
+                    cursor.execute("ALTER TABLE matches ADD COLUMN duration_seconds INTEGER DEFAULT 0")
+                self._rebuild_match_summary(cursor)
+            if version < 6:
+                # v6: globalny identyfikator meczu (ULID) i skrót zawartości - scalanie baz z kilku komputerów.
+                # Skrót liczony leniwie przy scalaniu (NULL = mecz zmieniony od ostatniego liczenia).
+                try:
+                    cursor.execute("SELECT uid FROM matches LIMIT 1")
+                except sqlite3.OperationalError:
+                    cursor.execute("ALTER TABLE matches ADD COLUMN uid TEXT")
+                    cursor.execute("ALTER TABLE matches ADD COLUMN content_hash TEXT")
+                # Istniejące mecze: uid wyprowadzony z daty i zawartości, nie losowy - ta sama stara baza
+                # zmigrowana ponownie (np. kopia do scalenia) dostaje te same uid. Mecze o tej samej dacie
+                # i zawartości rozróżnia numer kolejny.
+                cursor.executemany("UPDATE matches SET content_hash = ? WHERE id = ?", self._missing_content_hashes())
+                rows = cursor.execute("SELECT id, date, content_hash FROM matches WHERE uid IS NULL ORDER BY id").fetchall()
+                repeats = {}
+                uids = []
+                for match_id, date, content_hash in rows:
+                    n = repeats[date, content_hash] = repeats.get((date, content_hash), -1) + 1
+                    uids.append((self.new_match_uid(date, f"{date}|{content_hash}|{n}"), match_id))
+                cursor.executemany("UPDATE matches SET uid = ? WHERE id = ?", uids)
+                cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_uid ON matches(uid)")
+            if version < 7:
+                # v7: ranking Elo - stan bieżący, ostatni policzony mecz i punkty kontrolne (pełny stan co N meczów)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS player_ratings (
+                        player_name TEXT PRIMARY KEY,
+                        rating REAL,
+                        games INTEGER DEFAULT 0
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS rating_checkpoints (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        match_date TEXT,
+                        match_id INTEGER,
+                        applied INTEGER,
+                        ratings TEXT
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS rating_state (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        match_date TEXT DEFAULT '',
+                        match_id INTEGER DEFAULT 0,
+                        applied INTEGER DEFAULT 0
+                    )
+                ''')
+                cursor.execute("INSERT OR IGNORE INTO rating_state (id) VALUES (1)")
+                self._update_ratings(cursor)
+            if version < 8:
+                # v8: znaczniki czasu meczu (sekundy) i dzienne kubełki statystyk - rankingi za dowolny okres
+                try:
+                    cursor.execute("SELECT ended_at FROM matches LIMIT 1")
+                except sqlite3.OperationalError:
+                    cursor.execute("ALTER TABLE matches ADD COLUMN started_at INTEGER")
+                    cursor.execute("ALTER TABLE matches ADD COLUMN ended_at INTEGER")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_status_ended ON matches(status, ended_at)")
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS player_daily (
+                        day INTEGER NOT NULL,
+                        player_name TEXT NOT NULL,
+                        wins INTEGER DEFAULT 0,
+                        games_played INTEGER DEFAULT 0,
+                        rounds_played INTEGER DEFAULT 0,
+                        total_points INTEGER DEFAULT 0,
+                        meld_40 INTEGER DEFAULT 0,
+                        meld_60 INTEGER DEFAULT 0,
+                        meld_80 INTEGER DEFAULT 0,
+                        meld_100 INTEGER DEFAULT 0,
+                        PRIMARY KEY (day, player_name)
+                    ) WITHOUT ROWID
+                ''')
+                self.rebuild_player_daily()
+            if version < 9:
+                # v9: pojedynki (gracz kontra rywal) i składy stołu - sumy z zakończonych meczów
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS head_to_head (
+                        player_name TEXT NOT NULL,
+                        opponent TEXT NOT NULL,
+                        games INTEGER DEFAULT 0,
+                        wins INTEGER DEFAULT 0,
+                        ahead INTEGER DEFAULT 0,
+                        margin INTEGER DEFAULT 0,
+                        deals INTEGER DEFAULT 0,
+                        PRIMARY KEY (player_name, opponent)
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS lineup_stats (
+                        lineup TEXT NOT NULL,
+                        player_name TEXT NOT NULL,
+                        games INTEGER DEFAULT 0,
+                        wins INTEGER DEFAULT 0,
+                        margin INTEGER DEFAULT 0,
+                        deals INTEGER DEFAULT 0,
+                        PRIMARY KEY (lineup, player_name)
+                    ) WITHOUT ROWID
+                ''')
+                self.rebuild_head_to_head()
+            if version < 10:
+                # v10: wyniki meczów jednego gracza (wykres kariery) bez skanu match_players
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_match_players_player ON match_players(player_name)")
+            if version < 11:
+                # v11: ostatnie mecze gracza prosto z indeksu (próbki do szans na wygraną, bez sortowania)
+                cursor.execute("DROP INDEX IF EXISTS idx_match_players_player")
+                cursor.execute("CREATE INDEX idx_match_players_player ON match_players(player_name, match_id)")
+
+            if version < DB_SCHEMA_VERSION:
+                cursor.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+
+    def check_query_plans(self):
+        # Autotest EXPLAIN QUERY PLAN: zwraca zapytania, które nadal skanują całą tabelę
+        queries = {
+            'get_history_page': ("""
+                SELECT id, date, winner FROM matches
+                WHERE status = 'finished' AND (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT 100
+            """, ("", 0)),
+            'update_ratings': ("SELECT id, date FROM matches WHERE status = 'finished' AND (date, id) > (?, ?)",
+                               ("", 0)),
+            'apply_head_to_head': ("SELECT m.id, p.player_name FROM matches m JOIN match_players p ON p.match_id = m.id "
+                                   "WHERE m.status = 'finished' AND m.id = ?", (0,)),
+            'get_leaderboards': ("SELECT player_name, SUM(wins) FROM player_daily WHERE day BETWEEN ? AND ? "
+                                 "GROUP BY player_name", (0, 0)),
+            'get_top_wins': ("SELECT player_name, wins FROM player_stats WHERE wins > 0", ()),
+            'get_top_total_melds': ("SELECT player_name, meld_40 + meld_60 + meld_80 + meld_100 FROM player_stats", ()),
+            'get_top_100_melds': ("SELECT player_name, meld_100 FROM player_stats", ()),
+            'get_paused_games_page': ("""
+                SELECT m.id, m.date, p.player_name, p.total_points
+                FROM (SELECT id, date FROM matches WHERE status = 'paused' AND id < ? ORDER BY id DESC LIMIT ?) m
+                LEFT JOIN match_players p ON p.match_id = m.id
+            """, (0, 50)),
+            'get_score_samples': ("SELECT r.score_change FROM (SELECT match_id FROM match_players "
+                                  "WHERE player_name = ? ORDER BY match_id DESC LIMIT ?) p "
+                                  "JOIN rounds r ON r.match_id = p.match_id AND r.player_name = ?", ("", 200, "")),
+            'get_score_samples_pooled': ("SELECT score_change FROM rounds "
+                                         "WHERE match_id > (SELECT MAX(id) FROM matches) - ?", (200,)),
+            'get_player_career': ("SELECT p.total_points FROM match_players p JOIN matches m ON m.id = p.match_id "
+                                  "WHERE p.player_name = ? AND m.status = 'finished'", ("",)),
+            'get_match_snapshot': ("SELECT round_number, player_name, score_change FROM rounds WHERE match_id = ?", (0,)),
+            'get_match_summary': ("""
+                SELECT player_name, total_points, margin FROM match_players
+                WHERE match_id = ? ORDER BY seat
+            """, (0,)),
+            'get_match_details': ("""
+                SELECT round_number, player_name, score_change FROM rounds
+                WHERE match_id = ? ORDER BY round_number ASC
+            """, (0,)),
+            'delete_match': ("DELETE FROM rounds WHERE match_id = ?", (0,)),
+        }
+        problems = []
         cursor = self.conn.cursor()
-        # Aktualizacja dla starych baz danych
-        try:
-            cursor.execute("SELECT status FROM matches LIMIT 1")
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE matches ADD COLUMN status TEXT DEFAULT 'finished'")
-
-        try:
-            cursor.execute("SELECT initial_dealer_offset FROM matches LIMIT 1")
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE matches ADD COLUMN initial_dealer_offset INTEGER DEFAULT 0")
-
-        # Kolumny meldunków
-        try:
-            cursor.execute("SELECT meld_40 FROM rounds LIMIT 1")
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE rounds ADD COLUMN meld_40 INTEGER DEFAULT 0")
-            cursor.execute("ALTER TABLE rounds ADD COLUMN meld_60 INTEGER DEFAULT 0")
-            cursor.execute("ALTER TABLE rounds ADD COLUMN meld_80 INTEGER DEFAULT 0")
-            cursor.execute("ALTER TABLE rounds ADD COLUMN meld_100 INTEGER DEFAULT 0")
-
-        # NOWE KOLUMNY: DEKLARACJA
-        try:
-            cursor.execute("SELECT is_declaration FROM rounds LIMIT 1")
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE rounds ADD COLUMN is_declaration INTEGER DEFAULT 0")
-            cursor.execute("ALTER TABLE rounds ADD COLUMN declared_points INTEGER DEFAULT 0")
-
-        self.conn.commit()
-
-    def save_or_update_game(self, match_id, winner, game_log, status="finished", dealer_offset=0):
-        cursor = self.conn.cursor()
-        date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        if match_id is None:
-            cursor.execute("INSERT INTO matches (date, winner, status, initial_dealer_offset) VALUES (?, ?, ?, ?)",
-                           (date_str, winner, status, dealer_offset))
-            match_id = cursor.lastrowid
-        else:
-            cursor.execute("UPDATE matches SET winner = ?, status = ?, date = ?, initial_dealer_offset = ? WHERE id = ?",
-                           (winner, status, date_str, dealer_offset, match_id))
-            cursor.execute("DELETE FROM rounds WHERE match_id = ?", (match_id,))
-
-        for log in game_log:
-            m = log.get('melds', {'40':0, '60':0, '80':0, '100':0})
-            # Obsługa zapisu deklaracji
-            is_decl = log.get('is_declaration', 0)
-            decl_pts = log.get('declared_points', 0)
-
-            cursor.execute("""
+        # Skan małych tabel podsumowań (O(graczy)) jest zamierzony - pilnujemy tylko dużych
+        tables = {'matches', 'rounds', 'match_players', 'player_daily'}
+        for name, (sql, params) in queries.items():
+            for row in cursor.execute("EXPLAIN QUERY PLAN " + sql, params):
+                detail = row[-1]
+                # "SCAN tabela" bez "USING ... INDEX" oznacza pełny skan (podzapytania pomijamy)
+                words = detail.replace("SCAN TABLE ", "SCAN ").split()
+                if words[0] == "SCAN" and words[1] in tables and "INDEX" not in detail:
+                    problems.append((name, detail))
+        return problems
+
+    def append_rounds(self, match_id, round_entries, dealer_offset=0):
+        # Zapis przyrostowy: dopisujemy tylko wiersze nowego rozdania (jedna transakcja)
+        now = datetime.now()
+        date_str = now.strftime("%Y-%m-%d %H:%M:%S")
+        now_ts = int(now.timestamp())
+        rows = self._round_rows(round_entries)
+        last_round = max((row[0] for row in rows), default=0)
+        first_round = min((row[0] for row in rows), default=0)
+        with self.transaction() as cursor:
+            moved = False
+            if match_id is None:
+                cursor.execute("""
+                    INSERT INTO matches (uid, date, winner, status, initial_dealer_offset, rounds_count,
+                                         started_at, ended_at)
+                    VALUES (?, ?, NULL, 'paused', ?, ?, ?, ?)
+                """, (self.new_match_uid(), date_str, dealer_offset, last_round, now_ts, now_ts))
+                match_id = cursor.lastrowid
+            else:
+                # Gra wznowiona innego dnia - cały mecz przechodzi do kubełka z dzisiejszą datą
+                moved = cursor.execute(f"""
+                    SELECT {self.day_sql('ended_at')} != {self.day_sql('?')} FROM matches WHERE id = ?
+                """, (now_ts, match_id)).fetchone()[0] == 1
+                if moved: self._apply_daily(cursor, "m.id = ?", (match_id,), -1)
+                # Czas gry: odstęp od poprzedniego zapisu, dłuższe przerwy (pauza) liczone do limitu
+                cursor.execute("""
+                    UPDATE matches SET
+                        duration_seconds = IFNULL(duration_seconds, 0) + MIN(?, MAX(0,
+                            CAST(ROUND((julianday(?) - julianday(date)) * 86400) AS INTEGER))),
+                        rounds_count = MAX(IFNULL(rounds_count, 0), ?),
+                        date = ?, ended_at = ?, content_hash = NULL
+                    WHERE id = ?
+                """, (DEAL_GAP_LIMIT, date_str, last_round, date_str, now_ts, match_id))
+
+            cursor.executemany("""
                 INSERT INTO rounds (match_id, round_number, player_name, score_change,
                                     meld_40, meld_60, meld_80, meld_100,
                                     is_declaration, declared_points)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (match_id, log['round'], log['player'], log['score'],
-                  m['40'], m['60'], m['80'], m['100'],
-                  is_decl, decl_pts))
-
-        self.conn.commit()
+            """, [(match_id,) + row for row in rows])
+            self._add_round_stats(cursor, rows, date_str)
+            if moved:
+                self._apply_daily(cursor, "m.id = ?", (match_id,), 1)
+            else:
+                self._apply_daily(cursor, "m.id = ? AND r.round_number >= ?", (match_id, first_round), 1)
+
+            totals = {}
+            for row in rows:
+                totals[row[1]] = totals.get(row[1], 0) + row[2]
+            cursor.executemany("""
+                INSERT INTO match_players (match_id, player_name, seat, total_points) VALUES (?, ?, ?, ?)
+                ON CONFLICT(match_id, player_name) DO UPDATE SET total_points = total_points + excluded.total_points
+            """, [(match_id, name, seat, pts) for seat, (name, pts) in enumerate(totals.items())])
         return match_id
 
+    def recover_journal(self, match_id, log, dealer_offset=0, started=None):
+        # Dopisuje rozdania z dziennika (tysiac_journal), których nie ma jeszcze w bazie.
+        # Bezpieczne przy powtórzeniu. Zwraca (id meczu, liczba odzyskanych rozdań).
+        players = list(log.players)
+        with self.transaction() as cursor:
+            if match_id is None and started is not None:
+                # Awaria przed pierwszym potwierdzeniem zapisu - mecz mógł już powstać w bazie
+                row = cursor.execute("""
+                    SELECT id FROM matches WHERE status = 'paused' AND date >= ? ORDER BY id DESC LIMIT 1
+                """, (started,)).fetchone()
+                if row:
+                    seats = [r[0] for r in cursor.execute(
+                        "SELECT player_name FROM match_players WHERE match_id = ? ORDER BY seat", (row[0],))]
+                    if seats == players: match_id = row[0]
+            if match_id is not None:
+                status = cursor.execute("SELECT status FROM matches WHERE id = ?", (match_id,)).fetchone()
+                if status is None or status[0] == "finished": return None, 0
+            done = 0
+            if match_id is not None:
+                done = cursor.execute("SELECT IFNULL(MAX(round_number), 0) FROM rounds WHERE match_id = ?",
+                                      (match_id,)).fetchone()[0]
+            missing = GameLog(players)
+            for record in log.records():
+                if record[0] > done: missing.append(*record)
+            if len(missing):
+                match_id = self.append_rounds(match_id, missing, dealer_offset)
+        return match_id, len({record[0] for record in missing.records()})
+
+    def set_match_status(self, match_id, status, winner=None):
+        # Tania zmiana stanu meczu (pauza / koniec) bez ruszania tabeli rounds
+        now = datetime.now()
+        date_str = now.strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction() as cursor:
+            old = cursor.execute("SELECT status, winner, date FROM matches WHERE id = ?", (match_id,)).fetchone()
+            if old and old[0] == "finished":
+                self._apply_match_result(cursor, match_id, old[1], -1)
+                self._invalidate_ratings(cursor, old[2])
+            self._apply_daily(cursor, "m.id = ?", (match_id,), -1)
+            self._apply_head_to_head(cursor, "m.id = ?", (match_id,), -1)
+            cursor.execute("""
+                UPDATE matches SET winner = ?, status = ?, date = ?, ended_at = ?, content_hash = NULL WHERE id = ?
+            """, (winner, status, date_str, int(now.timestamp()), match_id))
+            if status == "finished":
+                self._apply_match_result(cursor, match_id, winner, 1)
+                # Kolejność rankingu to (data, id) - mecz może trafić przed już policzony
+                self._invalidate_ratings(cursor, date_str, match_id)
+            self._apply_daily(cursor, "m.id = ?", (match_id,), 1)
+            self._update_match_margins(cursor, match_id)
+            self._apply_head_to_head(cursor, "m.id = ?", (match_id,), 1)
+            self._update_ratings(cursor)
+
     def force_finish_match(self, match_id, winner):
-        cursor = self.conn.cursor()
-        date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute("UPDATE matches SET winner = ?, status = 'finished', date = ? WHERE id = ?",
-                       (winner, date_str, match_id))
-        self.conn.commit()
+        self.set_match_status(match_id, "finished", winner)
 
     def delete_match(self, match_id):
+        with self.transaction() as cursor:
+            self._retract_match_stats(cursor, match_id)
+            cursor.execute("DELETE FROM rounds WHERE match_id = ?", (match_id,))
+            cursor.execute("DELETE FROM match_players WHERE match_id = ?", (match_id,))
+            cursor.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+            self._update_ratings(cursor)
+
+    # --- PODSUMOWANIA MECZÓW (tabela match_players) ---
+    def _update_match_margins(self, cursor, match_id=None):
+        # Przewaga = suma gracza minus najlepszy wynik rywala (u zwycięzcy > 0)
+        where, params = ("WHERE match_id = ?", (match_id,)) if match_id is not None else ("", ())
+        cursor.execute(f"""
+            UPDATE match_players SET margin = total_points - IFNULL(
+                (SELECT MAX(o.total_points) FROM match_players o
+                 WHERE o.match_id = match_players.match_id AND o.player_name != match_players.player_name), 0)
+            {where}
+        """, params)
+
+    def _rebuild_match_summary(self, cursor, match_id=None):
+        # Przeliczenie z tabeli rounds (migracja, przepisanie meczu); czasu gry nie da się odtworzyć
+        where, params = ("WHERE match_id = ?", (match_id,)) if match_id is not None else ("", ())
+        cursor.execute(f"DELETE FROM match_players {where}", params)
+        cursor.execute(f"""
+            INSERT INTO match_players (match_id, player_name, seat, total_points)
+            SELECT match_id, player_name,
+                   ROW_NUMBER() OVER (PARTITION BY match_id ORDER BY MIN(id)) - 1, SUM(score_change)
+            FROM rounds {where} GROUP BY match_id, player_name
+        """, params)
+        cursor.execute(f"""
+            UPDATE matches SET rounds_count = (
+                SELECT IFNULL(MAX(round_number), 0) FROM rounds WHERE rounds.match_id = matches.id)
+            {where.replace("match_id", "id")}
+        """, params)
+        self._update_match_margins(cursor, match_id)
+
+    def rebuild_match_summaries(self):
+        with self.transaction() as cursor:
+            self._rebuild_match_summary(cursor)
+
+    # --- RANKING ELO (tysiac_rating, tabele player_ratings / rating_checkpoints) ---
+    def _update_ratings(self, cursor):
+        # Dolicza mecze zakończone po ostatnim policzonym (kolejność: data zakończenia, id).
+        # Po zwykłym zakończeniu gry to jeden mecz - bez przeliczania historii.
+        last_date, last_id, applied = cursor.execute(
+            "SELECT match_date, match_id, applied FROM rating_state").fetchone()
+        rows = self.conn.execute("""
+            SELECT m.id, m.date, m.winner, p.player_name, p.total_points
+            FROM matches m JOIN match_players p ON p.match_id = m.id
+            WHERE m.status = 'finished' AND (m.date, m.id) > (?, ?)
+            ORDER BY m.date, m.id, p.seat
+        """, (last_date, last_id)).fetchall()
+        if not rows: return
+        state = {name: [rating, games] for name, rating, games in
+                 cursor.execute("SELECT player_name, rating, games FROM player_ratings")}
+        touched = set()
+        checkpoints = []
+        for (match_id, date, winner), group in itertools.groupby(rows, key=lambda row: row[:3]):
+            touched.update(apply_match(state, [(row[3], row[4]) for row in group], winner))
+            applied += 1
+            last_date, last_id = date, match_id
+            if applied % RATING_CHECKPOINT_EVERY == 0:
+                checkpoints.append((date, match_id, applied, json.dumps(state, ensure_ascii=False)))
+        cursor.executemany("""
+            INSERT INTO player_ratings (player_name, rating, games) VALUES (?, ?, ?)
+            ON CONFLICT(player_name) DO UPDATE SET rating = excluded.rating, games = excluded.games
+        """, [(name,) + tuple(state[name]) for name in touched])
+        cursor.executemany("""
+            INSERT INTO rating_checkpoints (match_date, match_id, applied, ratings) VALUES (?, ?, ?, ?)
+        """, checkpoints)
+        cursor.execute("UPDATE rating_state SET match_date = ?, match_id = ?, applied = ?",
+                       (last_date, last_id, applied))
+
+    def _invalidate_ratings(self, cursor, since_date, match_id=0):
+        # Zmiana w już policzonej części historii (korekta, usunięcie, scalenie, mecz zakończony
+        # w tej samej sekundzie co późniejszy): wracamy do ostatniego punktu kontrolnego sprzed
+        # tej daty, _update_ratings dolicza resztę
+        last_date, last_id = cursor.execute("SELECT match_date, match_id FROM rating_state").fetchone()
+        if since_date is None or (since_date, match_id) > (last_date, last_id): return
+        cursor.execute("DELETE FROM rating_checkpoints WHERE match_date >= ?", (since_date,))
+        cursor.execute("DELETE FROM player_ratings")
+        row = cursor.execute("""
+            SELECT match_date, match_id, applied, ratings FROM rating_checkpoints ORDER BY id DESC LIMIT 1
+        """).fetchone()
+        if row is None:
+            cursor.execute("UPDATE rating_state SET match_date = '', match_id = 0, applied = 0")
+            return
+        cursor.executemany("INSERT INTO player_ratings (player_name, rating, games) VALUES (?, ?, ?)",
+                           [(name, rating, games) for name, (rating, games) in json.loads(row[3]).items()])
+        cursor.execute("UPDATE rating_state SET match_date = ?, match_id = ?, applied = ?", row[:3])
+
+    def rebuild_ratings(self):
+        with self.transaction() as cursor:
+            self._invalidate_ratings(cursor, "")
+            self._update_ratings(cursor)
+
+    def get_top_ratings(self):
         cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM rounds WHERE match_id = ?", (match_id,))
-        cursor.execute("DELETE FROM matches WHERE id = ?", (match_id,))
-        self.conn.commit()
+        cursor.execute("""
+            SELECT player_name, CAST(ROUND(rating) AS INTEGER) FROM player_ratings
+            WHERE games > 0
+            ORDER BY rating DESC, player_name LIMIT 5
+        """)
+        return cursor.fetchall()
 
-    def get_history(self):
+    # --- DZIENNE KUBEŁKI (tabela player_daily) - rankingi za okres ---
+    # Cały mecz liczy się do dnia ostatniej aktywności (ended_at, czas lokalny).
+    # Dzień = liczba dni od 1970-01-01 (jak QDate(1970, 1, 1).daysTo(data) w GUI).
+    @staticmethod
+    def day_sql(column):
+        return f"CAST(julianday({column}, 'unixepoch', 'localtime') - 2440587.5 AS INTEGER)"
+
+    def _apply_daily(self, cursor, where, params, sign):
+        # Wkład rozdań (m = matches, r = rounds) w kubełki; sign = 1 dopisuje, -1 odejmuje
+        cursor.execute(f"""
+            INSERT INTO player_daily (day, player_name, wins, games_played, rounds_played, total_points,
+                                      meld_40, meld_60, meld_80, meld_100)
+            SELECT {self.day_sql('m.ended_at')} AS day, r.player_name,
+                   ? * COUNT(DISTINCT CASE WHEN m.status = 'finished' AND m.winner = r.player_name THEN m.id END),
+                   ? * COUNT(DISTINCT CASE WHEN m.status = 'finished' THEN m.id END),
+                   ? * COUNT(*), ? * SUM(r.score_change),
+                   ? * SUM(r.meld_40), ? * SUM(r.meld_60), ? * SUM(r.meld_80), ? * SUM(r.meld_100)
+            FROM matches m JOIN rounds r ON r.match_id = m.id
+            WHERE {where}
+            GROUP BY day, r.player_name
+            ON CONFLICT(day, player_name) DO UPDATE SET
+                wins = wins + excluded.wins,
+                games_played = games_played + excluded.games_played,
+                rounds_played = rounds_played + excluded.rounds_played,
+                total_points = total_points + excluded.total_points,
+                meld_40 = meld_40 + excluded.meld_40,
+                meld_60 = meld_60 + excluded.meld_60,
+                meld_80 = meld_80 + excluded.meld_80,
+                meld_100 = meld_100 + excluded.meld_100
+        """, (sign,) * 8 + tuple(params))
+        if sign < 0:
+            cursor.execute("DELETE FROM player_daily WHERE rounds_played <= 0 AND wins <= 0 AND games_played <= 0")
+
+    def rebuild_player_daily(self):
+        with self.transaction() as cursor:
+            # Mecze bez znaczników czasu (stare bazy, import) - z tekstowej daty i czasu gry
+            cursor.execute("""
+                UPDATE matches SET ended_at = CAST(strftime('%s', date, 'utc') AS INTEGER)
+                WHERE ended_at IS NULL AND date IS NOT NULL
+            """)
+            cursor.execute("""
+                UPDATE matches SET started_at = ended_at - IFNULL(duration_seconds, 0)
+                WHERE started_at IS NULL AND ended_at IS NOT NULL
+            """)
+            cursor.execute("DELETE FROM player_daily")
+            self._apply_daily(cursor, "1", (), 1)
+
+    def get_season_years(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MIN(day), MAX(day) FROM player_daily")
+        first, last = cursor.fetchone()
+        if first is None: return []
+        epoch = datetime(1970, 1, 1)
+        return list(range((epoch + timedelta(days=last)).year, (epoch + timedelta(days=first)).year - 1, -1))
+
+    def get_leaderboards(self, window=None):
+        # Trzy rankingi menu (wygrane, meldunki, setki). window: (pierwszy dzień, ostatni dzień) włącznie;
+        # okres liczony jednym przejściem po kubełkach zamiast skanu rounds
+        if window is None:
+            return self.get_top_wins(), self.get_top_total_melds(), self.get_top_100_melds()
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT player_name, SUM(wins), SUM(meld_40 + meld_60 + meld_80 + meld_100), SUM(meld_100)
+            FROM player_daily
+            WHERE day BETWEEN ? AND ?
+            GROUP BY player_name HAVING SUM(rounds_played) > 0
+        """, window)
+        rows = cursor.fetchall()
+        boards = []
+        for col in (1, 2, 3):
+            ranked = sorted(rows, key=lambda row: (-row[col], row[0]))
+            boards.append([(row[0], row[col]) for row in ranked if col != 1 or row[col] > 0][:5])
+        return tuple(boards)
+
+    # --- POJEDYNKI I SKŁADY (tabele head_to_head / lineup_stats) ---
+    # Tylko mecze zakończone. Pojedynek: każda para graczy przy jednym stole, w obie strony;
+    # "ahead" = skończył przed rywalem (miejsca jak w rankingu Elo), margin = suma różnic punktów.
+    def _apply_head_to_head(self, cursor, where, params, sign):
+        # Jedno przejście po podsumowaniach meczów (m = matches, p = match_players), sumy w pamięci
+        rows = self.conn.execute(f"""
+            SELECT m.id, m.winner, IFNULL(m.rounds_count, 0), p.player_name, p.total_points
+            FROM matches m JOIN match_players p ON p.match_id = m.id
+            WHERE m.status = 'finished' AND {where}
+            ORDER BY m.id, p.seat
+        """, params)
+        pairs = {}
+        lineups = {}
+        for (_, winner, deals), group in itertools.groupby(rows, key=lambda row: row[:3]):
+            totals = [(row[3], row[4]) for row in group]
+            places = standings(totals, winner)
+            lineup = LINEUP_SEP.join(sorted(name for name, _ in totals))
+            for i, (name, points) in enumerate(totals):
+                best_rival = max((p for j, (_, p) in enumerate(totals) if j != i), default=0)
+                agg = lineups.setdefault((lineup, name), [0, 0, 0, 0])
+                agg[0] += 1
+                agg[1] += name == winner
+                agg[2] += points - best_rival
+                agg[3] += deals
+                for j, (rival, rival_points) in enumerate(totals):
+                    if i == j: continue
+                    agg = pairs.setdefault((name, rival), [0, 0, 0, 0, 0])
+                    agg[0] += 1
+                    agg[1] += name == winner
+                    agg[2] += places[i] < places[j]
+                    agg[3] += points - rival_points
+                    agg[4] += deals
+        cursor.executemany("""
+            INSERT INTO head_to_head (player_name, opponent, games, wins, ahead, margin, deals)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(player_name, opponent) DO UPDATE SET
+                games = games + excluded.games,
+                wins = wins + excluded.wins,
+                ahead = ahead + excluded.ahead,
+                margin = margin + excluded.margin,
+                deals = deals + excluded.deals
+        """, [key + tuple(sign * v for v in agg) for key, agg in pairs.items()])
+        cursor.executemany("""
+            INSERT INTO lineup_stats (lineup, player_name, games, wins, margin, deals)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(lineup, player_name) DO UPDATE SET
+                games = games + excluded.games,
+                wins = wins + excluded.wins,
+                margin = margin + excluded.margin,
+                deals = deals + excluded.deals
+        """, [key + tuple(sign * v for v in agg) for key, agg in lineups.items()])
+        if sign < 0:
+            cursor.execute("DELETE FROM head_to_head WHERE games <= 0")
+            cursor.execute("DELETE FROM lineup_stats WHERE games <= 0")
+
+    def rebuild_head_to_head(self):
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM head_to_head")
+            cursor.execute("DELETE FROM lineup_stats")
+            self._apply_head_to_head(cursor, "1", (), 1)
+
+    def get_head_to_head(self):
+        # Gracze (od najczęściej grających), pary gracz-rywal i składy stołu - odczyt gotowych sum
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, date, winner FROM matches WHERE status = 'finished' ORDER BY id DESC")
+        players = cursor.execute("""
+            SELECT player_name, SUM(games) FROM lineup_stats GROUP BY player_name ORDER BY 2 DESC, 1
+        """).fetchall()
+        pairs = cursor.execute("""
+            SELECT player_name, opponent, games, wins, ahead, margin, deals FROM head_to_head
+        """).fetchall()
+        lineups = cursor.execute("""
+            SELECT lineup, player_name, games, wins, margin, deals FROM lineup_stats ORDER BY lineup, player_name
+        """).fetchall()
+        return {'players': players, 'pairs': pairs, 'lineups': lineups}
+
+    def get_player_career(self, player):
+        # Punkty gracza w kolejnych zakończonych meczach (od najstarszego) - wykres kariery
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT p.total_points FROM match_players p JOIN matches m ON m.id = p.match_id
+            WHERE p.player_name = ? AND m.status = 'finished'
+            ORDER BY m.date, m.id
+        """, (player,))
+        return [row[0] for row in cursor]
+
+    # --- STATYSTYKI GRACZY (tabela player_stats) ---
+    # Kolumny liczników (last_played to tylko podpowiedź dla listy graczy - nie jest weryfikowana)
+    PLAYER_STATS_COLUMNS = ("player_name, wins, games_played, rounds_played, total_points, "
+                            "meld_40, meld_60, meld_80, meld_100, declarations_made, declarations_failed")
+    # Agregaty rozdań gracza w kolejności oczekiwanej przez _apply_stats
+    ROUND_AGGREGATES = """
+        player_name, COUNT(*), SUM(score_change),
+        SUM(meld_40), SUM(meld_60), SUM(meld_80), SUM(meld_100),
+        SUM(CASE WHEN is_declaration = 1 AND score_change >= 0 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN is_declaration = 1 AND score_change < 0 THEN 1 ELSE 0 END)
+    """
+
+    def _apply_stats(self, cursor, aggregates, sign, last_played=None):
+        # aggregates: (gracz, rozdania, punkty, m40, m60, m80, m100, deklaracje_ugrane, deklaracje_przegrane)
+        cursor.executemany("""
+            INSERT INTO player_stats (player_name, rounds_played, total_points,
+                                      meld_40, meld_60, meld_80, meld_100,
+                                      declarations_made, declarations_failed, last_played)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(player_name) DO UPDATE SET
+                last_played = CASE WHEN excluded.last_played > IFNULL(last_played, '')
+                                   THEN excluded.last_played ELSE last_played END,
+                rounds_played = rounds_played + excluded.rounds_played,
+                total_points = total_points + excluded.total_points,
+                meld_40 = meld_40 + excluded.meld_40,
+                meld_60 = meld_60 + excluded.meld_60,
+                meld_80 = meld_80 + excluded.meld_80,
+                meld_100 = meld_100 + excluded.meld_100,
+                declarations_made = declarations_made + excluded.declarations_made,
+                declarations_failed = declarations_failed + excluded.declarations_failed
+        """, [(row[0],) + tuple(sign * (v or 0) for v in row[1:]) + (last_played,) for row in aggregates])
+
+    @staticmethod
+    def _round_rows(round_entries):
+        # Wiersze jak w tabeli rounds: (runda, gracz, zmiana, m40, m60, m80, m100, deklaracja, zadeklarowano).
+        # Przyjmuje GameLog (GUI) albo listę słowników w starym formacie.
+        if isinstance(round_entries, GameLog): return list(round_entries.rows())
+        rows = []
+        for log in round_entries:
+            m = log.get('melds', NO_MELDS)
+            rows.append((log['round'], log['player'], log['score'],
+                         m['40'], m['60'], m['80'], m['100'],
+                         log.get('is_declaration', 0), log.get('declared_points', 0)))
+        return rows
+
+    def _add_round_stats(self, cursor, rows, date_str=None):
+        per_player = {}
+        for _, player, score, m40, m60, m80, m100, is_decl, _ in rows:
+            agg = per_player.setdefault(player, [0] * 8)
+            agg[0] += 1
+            agg[1] += score
+            agg[2] += m40; agg[3] += m60; agg[4] += m80; agg[5] += m100
+            if is_decl and score >= 0: agg[6] += 1
+            elif is_decl: agg[7] += 1
+        self._apply_stats(cursor, [(name,) + tuple(agg) for name, agg in per_player.items()], 1, date_str)
+
+    def _apply_match_result(self, cursor, match_id, winner, sign):
+        # Wygrane i rozegrane mecze liczą się tylko dla meczów zakończonych
+        cursor.execute("""
+            INSERT INTO player_stats (player_name, games_played)
+            SELECT DISTINCT player_name, ? FROM rounds WHERE match_id = ?
+            ON CONFLICT(player_name) DO UPDATE SET games_played = games_played + excluded.games_played
+        """, (sign, match_id))
+        if winner is not None:
+            cursor.execute("""
+                INSERT INTO player_stats (player_name, wins) VALUES (?, ?)
+                ON CONFLICT(player_name) DO UPDATE SET wins = wins + excluded.wins
+            """, (winner, sign))
+
+    def _retract_match_stats(self, cursor, match_id):
+        # Odejmuje wkład meczu od statystyk (przed usunięciem lub przepisaniem rozdań)
+        old = cursor.execute("SELECT status, winner, date FROM matches WHERE id = ?", (match_id,)).fetchone()
+        if old and old[0] == "finished":
+            self._apply_match_result(cursor, match_id, old[1], -1)
+            self._invalidate_ratings(cursor, old[2])
+        self._apply_daily(cursor, "m.id = ?", (match_id,), -1)
+        self._apply_head_to_head(cursor, "m.id = ?", (match_id,), -1)
+        cursor.execute(f"SELECT {self.ROUND_AGGREGATES} FROM rounds WHERE match_id = ? GROUP BY player_name",
+                       (match_id,))
+        self._apply_stats(cursor, cursor.fetchall(), -1)
+        cursor.execute("DELETE FROM player_stats WHERE rounds_played <= 0 AND wins <= 0")
+
+    def rebuild_player_stats(self):
+        # Przeliczenie statystyk od zera z surowych danych. Zwraca graczy, u których były rozbieżności.
+        with self.transaction() as cursor:
+            before = {row[0]: row[1:] for row in cursor.execute(f"SELECT {self.PLAYER_STATS_COLUMNS} FROM player_stats")}
+            cursor.execute("DELETE FROM player_stats")
+            cursor.execute("""
+                INSERT INTO player_stats (player_name, rounds_played, total_points,
+                                          meld_40, meld_60, meld_80, meld_100,
+                                          declarations_made, declarations_failed)
+                SELECT player_name, COUNT(*), SUM(score_change),
+                       SUM(meld_40), SUM(meld_60), SUM(meld_80), SUM(meld_100),
+                       SUM(CASE WHEN is_declaration = 1 AND score_change >= 0 THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN is_declaration = 1 AND score_change < 0 THEN 1 ELSE 0 END)
+                FROM rounds GROUP BY player_name
+            """)
+            cursor.execute("""
+                INSERT OR IGNORE INTO player_stats (player_name)
+                SELECT DISTINCT winner FROM matches WHERE status = 'finished' AND winner IS NOT NULL
+            """)
+            cursor.execute("""
+                UPDATE player_stats SET
+                    wins = (SELECT COUNT(*) FROM matches
+                            WHERE status = 'finished' AND winner = player_stats.player_name),
+                    games_played = (SELECT COUNT(DISTINCT r.match_id) FROM rounds r
+                                    JOIN matches m ON m.id = r.match_id
+                                    WHERE m.status = 'finished' AND r.player_name = player_stats.player_name)
+            """)
+            cursor.execute("""
+                UPDATE player_stats SET last_played = (
+                    SELECT MAX(m.date) FROM rounds r JOIN matches m ON m.id = r.match_id
+                    WHERE r.player_name = player_stats.player_name)
+            """)
+            after = {row[0]: row[1:] for row in cursor.execute(f"SELECT {self.PLAYER_STATS_COLUMNS} FROM player_stats")}
+        return sorted(name for name in before.keys() | after.keys() if before.get(name) != after.get(name))
+
+    # --- SCALANIE BAZ (kilka komputerów) ---
+    @staticmethod
+    def new_match_uid(date_str=None, seed=None):
+        # ULID: sortuje się jak data rozpoczęcia, unikalny między komputerami.
+        # seed: część losowa wyprowadzona ze skrótu - ten sam seed daje ten sam uid (migracja starych baz)
+        if date_str:
+            ms = int(datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+        else:
+            ms = int(time.time() * 1000)
+        tail = hashlib.sha1(seed.encode("utf-8")).digest()[:10] if seed else os.urandom(10)
+        value = (ms << 80) | int.from_bytes(tail, "big")
+        return "".join(ULID_ALPHABET[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+    @staticmethod
+    def _content_hash(status, winner, dealer_offset, rows):
+        # Data i czas gry pomijane - przy wstrzymaniu różnią się między komputerami
+        return hashlib.sha1(repr((status, winner, dealer_offset, rows)).encode("utf-8")).hexdigest()
+
+    def _missing_content_hashes(self, schema="main"):
+        # Skróty tylko dla meczów zmienionych od ostatniego liczenia (content_hash IS NULL). Zwraca (skrót, id).
+        rows = self.conn.execute(f"""
+            SELECT m.id, m.status, m.winner, m.initial_dealer_offset,
+                   r.round_number, r.player_name, r.score_change,
+                   r.meld_40, r.meld_60, r.meld_80, r.meld_100, r.is_declaration, r.declared_points
+            FROM (SELECT id, status, winner, initial_dealer_offset FROM {schema}.matches WHERE content_hash IS NULL) m
+            LEFT JOIN {schema}.rounds r ON r.match_id = m.id
+            ORDER BY m.id, r.round_number, r.id
+        """)
+        hashes = []
+        for match_id, group in itertools.groupby(rows, key=lambda row: row[0]):
+            group = list(group)
+            rounds = [row[4:] for row in group if row[4] is not None]
+            hashes.append((self._content_hash(*group[0][1:4], rounds), match_id))
+        return hashes
+
+    def _refresh_content_hashes(self, cursor):
+        cursor.executemany("UPDATE matches SET content_hash = ? WHERE id = ?", self._missing_content_hashes())
+
+    @staticmethod
+    def _open_merge_source(path):
+        # Źródło scalania otwierane tylko do odczytu - plik (np. na pendrivie, kopia zapasowa) nie jest zmieniany.
+        # Zwraca (URI do ATTACH, katalog tymczasowy do usunięcia albo None).
+        uri = Path(path).as_uri()
+        try:
+            source = sqlite3.connect(uri + "?mode=ro", uri=True)
+            version = source.execute("PRAGMA user_version").fetchone()[0]
+            uri += "?mode=ro"
+        except sqlite3.OperationalError:
+            # Baza WAL na nośniku tylko do odczytu (nie da się utworzyć pliku -shm)
+            source = sqlite3.connect(uri + "?immutable=1", uri=True)
+            version = source.execute("PRAGMA user_version").fetchone()[0]
+            uri += "?immutable=1"
+        try:
+            if version > DB_SCHEMA_VERSION:
+                raise ValueError(f"Baza {path} pochodzi z nowszej wersji programu (schemat {version}, "
+                                 f"obsługiwany {DB_SCHEMA_VERSION})")
+            if version == DB_SCHEMA_VERSION:
+                return uri, None
+            # Starszy schemat: migrujemy kopię w katalogu tymczasowym, oryginał zostaje bez zmian
+            tmp_dir = tempfile.mkdtemp(prefix="tysiac_merge_")
+            copy_path = os.path.join(tmp_dir, "source.db")
+            copy = sqlite3.connect(copy_path)
+            source.backup(copy)
+            copy.close()
+            TysiacDB(copy_path).conn.close()
+            return Path(copy_path).as_uri() + "?mode=ro", tmp_dir
+        finally:
+            source.close()
+
+    def merge_from(self, path):
+        # Dołącza mecze z bazy innego komputera: brakujące (po uid i skrócie) oraz te, które tam są
+        # dalej rozegrane (inny skrót). Kopiowanie w jednej transakcji, statystyki przyrostowo.
+        # Zwraca (nowe, zaktualizowane, pominięte).
+        path = os.path.abspath(path)
+        if os.path.exists(self.db_path) and os.path.exists(path) and os.path.samefile(path, self.db_path):
+            raise ValueError("Nie można scalić bazy z samą sobą")
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        uri, tmp_dir = self._open_merge_source(path)
+
+        added = updated = skipped = 0
+        self.conn.execute("ATTACH DATABASE ? AS src", (uri,))
+        try:
+            with self.transaction() as cursor:
+                self._refresh_content_hashes(cursor)
+                # Skróty źródła: zapisane tam albo policzone teraz (w pamięci - źródła nie zmieniamy)
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS src_hashes (id INTEGER PRIMARY KEY, content_hash TEXT)")
+                cursor.execute("DELETE FROM src_hashes")
+                cursor.execute("INSERT INTO src_hashes SELECT id, content_hash FROM src.matches")
+                cursor.executemany("UPDATE src_hashes SET content_hash = ? WHERE id = ?",
+                                   self._missing_content_hashes("src"))
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS merge_ids (src_id INTEGER PRIMARY KEY, main_id INTEGER)")
+                cursor.execute("DELETE FROM merge_ids")
+                # Para po uid, a gdy uid nieznany - po dacie i skrócie zawartości (mecze ze starych baz,
+                # którym uid nadano osobno na każdym komputerze)
+                diff = cursor.execute("""
+                    SELECT s.id, m.id, s.status = 'finished', IFNULL(s.rounds_count, 0), IFNULL(s.date, ''),
+                           m.status = 'finished', IFNULL(m.rounds_count, 0), IFNULL(m.date, '')
+                    FROM src.matches s JOIN src_hashes h ON h.id = s.id
+                    LEFT JOIN main.matches m ON m.id = IFNULL(
+                        (SELECT id FROM main.matches WHERE uid = s.uid),
+                        (SELECT id FROM main.matches
+                         WHERE status = s.status AND date = s.date AND content_hash = h.content_hash LIMIT 1))
+                    WHERE m.id IS NULL OR m.content_hash IS NOT h.content_hash
+                """).fetchall()
+                for src_id, main_id, *versions in diff:
+                    if main_id is None:
+                        added += 1
+                    elif tuple(versions[:3]) > tuple(versions[3:]):
+                        # Ten sam mecz, dalej rozegrany na drugim komputerze - podmieniamy rozdania
+                        self._retract_match_stats(cursor, main_id)
+                        cursor.execute("DELETE FROM rounds WHERE match_id = ?", (main_id,))
+                        cursor.execute("""
+                            UPDATE matches SET (date, winner, status, initial_dealer_offset, duration_seconds,
+                                                content_hash, started_at, ended_at) =
+                                (SELECT s.date, s.winner, s.status, s.initial_dealer_offset, s.duration_seconds,
+                                        h.content_hash, s.started_at, s.ended_at
+                                 FROM src.matches s JOIN src_hashes h ON h.id = s.id WHERE s.id = ?)
+                            WHERE id = ?
+                        """, (src_id, main_id))
+                        updated += 1
+                    else:
+                        skipped += 1
+                        continue
+                    cursor.execute("INSERT INTO merge_ids (src_id, main_id) VALUES (?, ?)", (src_id, main_id))
+
+                cursor.execute("""
+                    INSERT INTO matches (uid, date, winner, status, initial_dealer_offset, duration_seconds, content_hash,
+                                         started_at, ended_at)
+                    SELECT s.uid, s.date, s.winner, s.status, s.initial_dealer_offset, s.duration_seconds,
+                           h.content_hash, s.started_at, s.ended_at
+                    FROM src.matches s JOIN src_hashes h ON h.id = s.id
+                    WHERE s.id IN (SELECT src_id FROM merge_ids WHERE main_id IS NULL)
+                    ORDER BY s.id
+                """)
+                cursor.execute("""
+                    UPDATE merge_ids SET main_id = (
+                        SELECT m.id FROM main.matches m JOIN src.matches s ON s.uid = m.uid WHERE s.id = merge_ids.src_id)
+                    WHERE main_id IS NULL
+                """)
+                cursor.execute("""
+                    INSERT INTO rounds (match_id, round_number, player_name, score_change,
+                                        meld_40, meld_60, meld_80, meld_100,
+                                        is_declaration, declared_points)
+                    SELECT g.main_id, r.round_number, r.player_name, r.score_change,
+                           r.meld_40, r.meld_60, r.meld_80, r.meld_100, r.is_declaration, r.declared_points
+                    FROM merge_ids g JOIN src.rounds r ON r.match_id = g.src_id
+                    ORDER BY g.src_id, r.round_number, r.id
+                """)
+                self._apply_merged_stats(cursor)
+                for (main_id,) in cursor.execute("SELECT main_id FROM merge_ids").fetchall():
+                    self._rebuild_match_summary(cursor, main_id)
+                self._apply_head_to_head(cursor, "m.id IN (SELECT main_id FROM merge_ids)", (), 1)
+                # Mecze z przeszłości: ranking od punktu kontrolnego sprzed najstarszego z nich
+                self._invalidate_ratings(cursor, cursor.execute("""
+                    SELECT MIN(date) FROM matches WHERE status = 'finished' AND id IN (SELECT main_id FROM merge_ids)
+                """).fetchone()[0])
+                self._update_ratings(cursor)
+                cursor.execute("DROP TABLE merge_ids")
+                cursor.execute("DROP TABLE src_hashes")
+        finally:
+            self.conn.execute("DETACH DATABASE src")
+            if tmp_dir: shutil.rmtree(tmp_dir, ignore_errors=True)
+        return added, updated, skipped
+
+    def _apply_merged_stats(self, cursor):
+        # Wkład meczów z merge_ids w player_stats - jedno zapytanie na rodzaj licznika
+        merged = "SELECT main_id FROM merge_ids"
+        cursor.execute(f"SELECT {self.ROUND_AGGREGATES} FROM rounds WHERE match_id IN ({merged}) GROUP BY player_name")
+        self._apply_stats(cursor, cursor.fetchall(), 1)
+        cursor.execute(f"""
+            INSERT INTO player_stats (player_name, games_played)
+            SELECT r.player_name, COUNT(DISTINCT r.match_id) FROM rounds r JOIN matches m ON m.id = r.match_id
+            WHERE m.status = 'finished' AND r.match_id IN ({merged}) GROUP BY r.player_name
+            ON CONFLICT(player_name) DO UPDATE SET games_played = games_played + excluded.games_played
+        """)
+        cursor.execute(f"""
+            INSERT INTO player_stats (player_name, wins)
+            SELECT winner, COUNT(*) FROM matches
+            WHERE status = 'finished' AND winner IS NOT NULL AND id IN ({merged}) GROUP BY winner
+            ON CONFLICT(player_name) DO UPDATE SET wins = wins + excluded.wins
+        """)
+        cursor.execute(f"""
+            UPDATE player_stats SET last_played = (
+                SELECT MAX(m.date) FROM rounds r JOIN matches m ON m.id = r.match_id
+                WHERE r.player_name = player_stats.player_name)
+            WHERE player_name IN (SELECT DISTINCT player_name FROM rounds WHERE match_id IN ({merged}))
+        """)
+        cursor.execute("DELETE FROM player_stats WHERE rounds_played <= 0 AND wins <= 0")
+        self._apply_daily(cursor, f"m.id IN ({merged})", (), 1)
+
+    # Kolumny sortowania archiwum (kolejność jak w widoku: ID, Data, Zwycięzca)
+    HISTORY_SORT_KEYS = ("id", "date", "IFNULL(winner, '')")
+
+    def get_history_page(self, after=None, limit=100, sort_column=0, descending=True,
+                         player=None, date_from=None, date_to=None):
+        # Stronicowanie po kluczu (wartość sortowania, id) - sortowanie i filtrowanie po stronie SQL.
+        # Zwraca wiersze (id, data, zwycięzca, klucz_sortowania).
+        key = self.HISTORY_SORT_KEYS[sort_column]
+        where = ["status = 'finished'"]
+        params = []
+        if player:
+            where.append("EXISTS (SELECT 1 FROM rounds WHERE rounds.match_id = matches.id AND rounds.player_name = ?)")
+            params.append(player)
+        if date_from:
+            where.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("date < ?")
+            params.append(date_to)
+        if after is not None:
+            where.append(f"({key}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+        direction = "DESC" if descending else "ASC"
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT id, date, winner, {key} FROM matches
+            WHERE {' AND '.join(where)}
+            ORDER BY {key} {direction}, id {direction}
+            LIMIT ?
+        """, params + [limit])
         return cursor.fetchall()
 
     def get_top_wins(self):
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT winner, COUNT(*) as wins
-            FROM matches
-            WHERE status = 'finished' AND winner IS NOT NULL
-            GROUP BY winner
-            ORDER BY wins DESC LIMIT 5
+            SELECT player_name, wins FROM player_stats
+            WHERE wins > 0
+            ORDER BY wins DESC, player_name LIMIT 5
         """)
         return cursor.fetchall()
 
     def get_top_total_melds(self):
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT player_name, SUM(meld_40 + meld_60 + meld_80 + meld_100) as total
-            FROM rounds
-            GROUP BY player_name
-            ORDER BY total DESC LIMIT 5
+            SELECT player_name, meld_40 + meld_60 + meld_80 + meld_100 as total
+            FROM player_stats
+            WHERE rounds_played > 0
+            ORDER BY total DESC, player_name LIMIT 5
         """)
         return cursor.fetchall()
 
     def get_top_100_melds(self):
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT player_name, SUM(meld_100) as cnt
-            FROM rounds
-            GROUP BY player_name
-            ORDER BY cnt DESC LIMIT 5
+            SELECT player_name, meld_100 as cnt
+            FROM player_stats
+            WHERE rounds_played > 0
+            ORDER BY cnt DESC, player_name LIMIT 5
         """)
         return cursor.fetchall()
 
-    def get_paused_games_summary(self):
+    def get_paused_games_page(self, before_id=None, limit=50):
+        # Jedno zapytanie grupujące dla całej strony (zamiast osobnego SUM dla każdego meczu)
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, date FROM matches WHERE status = 'paused' ORDER BY id DESC")
-        paused_matches = cursor.fetchall()
+        cursor.execute("""
+            SELECT m.id, m.date, p.player_name, p.total_points
+            FROM (SELECT id, date FROM matches
+                  WHERE status = 'paused' AND id < ?
+                  ORDER BY id DESC LIMIT ?) m
+            LEFT JOIN match_players p ON p.match_id = m.id
+            ORDER BY m.id DESC, p.player_name
+        """, (before_id if before_id is not None else sys.maxsize, limit))
         results = []
-        for mid, mdate in paused_matches:
-            cursor.execute("SELECT player_name, SUM(score_change) FROM rounds WHERE match_id = ? GROUP BY player_name", (mid,))
-            scores = cursor.fetchall()
-            score_str = ", ".join([f"{name}: {pts}" for name, pts in scores])
-            results.append((mid, mdate, score_str))
-        return results
-
-    def get_match_metadata(self, match_id):
+        for row in cursor.fetchall():
+            mid, mdate, name, pts = row
+            if not results or results[-1][0] != mid:
+                results.append((mid, mdate, []))
+            if name is not None:
+                results[-1][2].append(f"{name}: {pts}")
+        return [(mid, mdate, ", ".join(scores)) for mid, mdate, scores in results]
+
+    def get_match_summary(self, match_id):
+        # Sumy z match_players - bez przeglądania rozdań meczu
         cursor = self.conn.cursor()
-        cursor.execute("SELECT initial_dealer_offset FROM matches WHERE id = ?", (match_id,))
-        res = cursor.fetchone()
-        if res: return {'dealer_offset': res[0]}
-        return {'dealer_offset': 0}
+        row = cursor.execute("SELECT rounds_count, duration_seconds FROM matches WHERE id = ?",
+                             (match_id,)).fetchone()
+        if row is None: return None
+        players = cursor.execute("""
+            SELECT player_name, total_points, margin FROM match_players
+            WHERE match_id = ? ORDER BY seat
+        """, (match_id,)).fetchall()
+        has_points = cursor.execute("SELECT EXISTS (SELECT 1 FROM rounds WHERE match_id = ? AND score_change != 0)",
+                                    (match_id,)).fetchone()[0]
+        return {'rounds': row[0] or 0, 'duration': row[1] or 0, 'players': players, 'has_points': bool(has_points)}
+
+    def get_match_snapshot(self, match_id):
+        # Wznowienie gry: sumy z match_players + kolumnowa historia punktów (bez słownika na wiersz)
+        cursor = self.conn.cursor()
+        meta = cursor.execute("SELECT initial_dealer_offset, rounds_count FROM matches WHERE id = ?",
+                              (match_id,)).fetchone()
+        if meta is None: return None
+        seats = cursor.execute("SELECT player_name, total_points FROM match_players WHERE match_id = ? ORDER BY seat",
+                               (match_id,)).fetchall()
+        if not seats: return None
+        players = [name for name, _ in seats]
+        index = {name: i for i, name in enumerate(players)}
+        sheet = ScoreSheet(len(players), meta[1] or 0)
+        cursor.execute("SELECT round_number, player_name, score_change FROM rounds WHERE match_id = ?", (match_id,))
+        for round_number, name, score in cursor:
+            sheet.set(round_number - 1, index[name], score)
+        return {'players': players, 'totals': [total for _, total in seats], 'sheet': sheet,
+                'dealer_offset': meta[0] or 0}
 
     def get_match_details(self, match_id):
         cursor = self.conn.cursor()
@@ -206,15 +1226,224 @@ class TysiacDB:
         """, (match_id,))
         return cursor.fetchall()
 
-    def get_all_player_names(self):
+    def get_score_samples(self, players, matches=200):
+        # Zmiany punktów z ostatnich meczów każdego gracza i wszystkich razem - rozkłady do symulacji
+        # szans na wygraną. Tylko indeksy (match_players.player_name, rounds.match_id) - koszt zależy
+        # od liczby branych meczów, nie od wielkości archiwum.
+        cursor = self.conn.cursor()
+        samples = {}
+        for name in players:
+            cursor.execute("""
+                SELECT r.score_change
+                FROM (SELECT match_id FROM match_players WHERE player_name = ? ORDER BY match_id DESC LIMIT ?) p
+                JOIN rounds r ON r.match_id = p.match_id AND r.player_name = ?
+            """, (name, matches, name))
+            samples[name] = [row[0] for row in cursor]
+        # Wspólny rozkład: zakres ostatnich identyfikatorów meczów (usunięte mecze najwyżej go zmniejszają)
+        cursor.execute("SELECT score_change FROM rounds WHERE match_id > (SELECT MAX(id) FROM matches) - ?",
+                       (matches,))
+        return samples, [row[0] for row in cursor]
+
+    def get_player_suggestions(self, prefix="", limit=-1):
+        # Ranking: liczba rozdań wygaszana z czasem od ostatniej gry (skala 30 dni)
         cursor = self.conn.cursor()
-        cursor.execute("SELECT DISTINCT player_name FROM rounds ORDER BY player_name")
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        cursor.execute("""
+            SELECT player_name FROM player_stats
+            WHERE rounds_played > 0 AND player_name LIKE ? ESCAPE '\\'
+            ORDER BY (rounds_played + 1.0)
+                     / (1.0 + (julianday('now', 'localtime') - julianday(IFNULL(last_played, '2000-01-01'))) / 30.0) DESC,
+                     player_name
+            LIMIT ?
+        """, (escaped + "%", limit))
         return [row[0] for row in cursor.fetchall()]
 
+# ==========================================
+# WĄTEK BAZY DANYCH
+# ==========================================
+class MatchRef:
+    # Id meczu ustalane dopiero w wątku bazy (mecz powstaje przy pierwszym rozdaniu).
+    # Zlecenia wykonują się po kolei, więc kolejne zapisy widzą już nadane id.
+    __slots__ = ('id',)
+
+    def __init__(self, match_id=None):
+        self.id = match_id
+
+
+class DBWorker(QThread):
+    # Wątek z własnym połączeniem - GUI nigdy nie czeka na dysk
+    result_ready = Signal(int, object, object)
+
+    WRITE_METHODS = {'append_rounds', 'set_match_status',
+                     'force_finish_match', 'delete_match', 'rebuild_player_stats', 'recover_journal',
+                     'rebuild_ratings', 'rebuild_player_daily', 'rebuild_head_to_head'}
+    # Metody zwracające id (ewentualnie nowo utworzonego) meczu
+    CREATING_METHODS = {'append_rounds'}
+
+    def __init__(self, db_name="tysiac.db", profile=None):
+        super().__init__()
+        self.db_name = db_name
+        self.profile = profile
+        self.jobs = queue.Queue()
+
+    def run(self):
+        db = TysiacDB(self.db_name, self.profile)
+        running = True
+        while running:
+            batch = [self.jobs.get()]
+            # Bierzemy wszystko, co już czeka - kolejne zapisy idą w jednej transakcji
+            while True:
+                try: batch.append(self.jobs.get_nowait())
+                except queue.Empty: break
+            if None in batch:
+                running = False
+                batch = [job for job in batch if job is not None]
+
+            writes = []
+            for job in batch:
+                if job[1] in self.WRITE_METHODS:
+                    writes.append(job)
+                    continue
+                self.run_writes(db, writes)
+                writes = []
+                self.run_job(db, job)
+            self.run_writes(db, writes)
+        db.conn.close()
+
+    def call(self, db, job, assigned):
+        _, method, args, kwargs = job
+        if method is None: return None  # znacznik (when_idle)
+        real_args = [a.id if isinstance(a, MatchRef) else a for a in args]
+        result = getattr(db, method)(*real_args, **kwargs)
+        if method in self.CREATING_METHODS:
+            for a in args:
+                if isinstance(a, MatchRef) and a.id is None:
+                    a.id = result
+                    assigned.append(a)
+        return result
+
+    def run_job(self, db, job):
+        try:
+            result = self.call(db, job, [])
+        except Exception as e:
+            self.result_ready.emit(job[0], None, e)
+            return
+        self.result_ready.emit(job[0], result, None)
+
+    def run_writes(self, db, writes):
+        if len(writes) <= 1:
+            for job in writes: self.run_job(db, job)
+            return
+        assigned = []
+        results = []
+        try:
+            with db.transaction():
+                for job in writes:
+                    results.append(self.call(db, job, assigned))
+        except Exception:
+            # Wycofane - powtarzamy pojedynczo, żeby błąd dotyczył tylko jednego zlecenia
+            for ref in assigned: ref.id = None
+            for job in writes: self.run_job(db, job)
+            return
+        for job, result in zip(writes, results):
+            self.result_ready.emit(job[0], result, None)
+
+
+class DBExecutor(QObject):
+    # Asynchroniczny dostęp do TysiacDB: submit("metoda", *args, callback=...)
+    # Wyniki wracają sygnałem do wątku GUI, w kolejności zleceń.
+    def __init__(self, db_name="tysiac.db", profile=None, parent=None):
+        super().__init__(parent)
+        self.callbacks = {}
+        self.request_ids = itertools.count(1)
+        # Licznik zleceń zapisu - widoki odświeżają cache tylko po zmianie danych
+        self.write_version = 0
+        self.worker = DBWorker(db_name, profile)
+        self.worker.result_ready.connect(self.on_result)
+        self.worker.start()
+
+    def submit(self, method, *args, callback=None, on_error=None, **kwargs):
+        req_id = next(self.request_ids)
+        if method in DBWorker.WRITE_METHODS: self.write_version += 1
+        self.callbacks[req_id] = (callback, on_error)
+        self.worker.jobs.put((req_id, method, args, kwargs))
+        return req_id
+
+    def when_idle(self, callback):
+        # Wywoła callback, gdy wszystkie wcześniejsze zlecenia zostaną obsłużone
+        req_id = next(self.request_ids)
+        self.callbacks[req_id] = (lambda _: callback(), None)
+        self.worker.jobs.put((req_id, None, (), {}))
+
+    def on_result(self, req_id, result, error):
+        callback, on_error = self.callbacks.pop(req_id, (None, None))
+        if error is not None:
+            if on_error: on_error(error)
+            else: QMessageBox.critical(None, "Błąd bazy danych", str(error))
+        elif callback:
+            callback(result)
+
+    def shutdown(self):
+        # Dokańcza zaległe zapisy i zamyka połączenie
+        self.worker.jobs.put(None)
+        self.worker.wait()
+
+
+class OddsWorker(QThread):
+    # Symulacja szans na wygraną poza wątkiem GUI (tysiac_odds; NumPy importowany dopiero tutaj).
+    # Każde zlecenie ma numer - nowsze przerywa trwającą symulację, starsze wyniki są odrzucane.
+    result_ready = Signal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = queue.Queue()
+        self.generation = 0
+        # Rozkłady zmian punktów wyuczone z archiwum - raz na skład graczy
+        self.distributions = {}
+
+    def request(self, players, scores, samples):
+        self.generation += 1
+        self.jobs.put((self.generation, tuple(players), list(scores), samples))
+        return self.generation
+
+    def cancel(self):
+        self.generation += 1
+
+    def run(self):
+        import tysiac_odds
+        while True:
+            batch = [self.jobs.get()]
+            while True:
+                try: batch.append(self.jobs.get_nowait())
+                except queue.Empty: break
+            if None in batch: return
+            generation, players, scores, samples = batch[-1]
+            if generation != self.generation: continue
+            key = frozenset(players)
+            if key not in self.distributions:
+                self.distributions[key] = tysiac_odds.build_distributions(*samples)
+            dists = self.distributions[key]
+            if dists is None:
+                # Puste archiwum - nie ma z czego liczyć
+                self.result_ready.emit(generation, None)
+                continue
+            probs = tysiac_odds.estimate_win_odds(scores, [dists[name] for name in players],
+                                                  cancel=lambda: generation != self.generation)
+            if probs is not None:
+                self.result_ready.emit(generation, probs)
+
+    def shutdown(self):
+        self.cancel()
+        self.jobs.put(None)
+        self.wait()
+
+
 # ==========================================
 # OKNO DIALOGOWE: WSTRZYMANE GRY
 # ==========================================
 class PausedGamesDialog(QDialog):
+    PAGE_SIZE = 50
+
     def __init__(self, parent, db, main_window):
         super().__init__(parent)
         self.db = db
@@ -230,7 +1459,12 @@ class PausedGamesDialog(QDialog):
         self.tree.setColumnHidden(0, True)
         self.tree.header().setSectionResizeMode(2, QHeaderView.Stretch)
         self.tree.itemDoubleClicked.connect(self.resume_selected)
+        self.tree.verticalScrollBar().valueChanged.connect(self.on_scroll)
         layout.addWidget(self.tree)
+        self.next_before_id = None
+        self.has_more = False
+        self.loading = False
+        self.generation = 0
 
         btn_layout = QHBoxLayout()
         btn_resume = QPushButton("▶ Wznów Grę")
@@ -252,73 +1486,283 @@ class PausedGamesDialog(QDialog):
 
     def refresh_list(self):
         self.tree.clear()
-        paused = self.db.get_paused_games_summary()
-        for pid, date, status in paused:
+        self.generation += 1
+        self.next_before_id = None
+        self.has_more = True
+        self.loading = False
+        self.load_next_page()
+
+    def load_next_page(self):
+        if not self.has_more or self.loading: return
+        self.loading = True
+        generation = self.generation
+        self.db.submit("get_paused_games_page", self.next_before_id, self.PAGE_SIZE,
+                       callback=lambda page: self.on_page_loaded(generation, page))
+
+    def on_page_loaded(self, generation, page):
+        if generation != self.generation: return  # lista odświeżona w międzyczasie
+        self.loading = False
+        self.has_more = len(page) == self.PAGE_SIZE
+        if page: self.next_before_id = page[-1][0]
+        for pid, date, status in page:
             self.tree.addTopLevelItem(QTreeWidgetItem([str(pid), date, status]))
 
+    def on_scroll(self, value):
+        # Doczytujemy kolejną stronę po dojechaniu do końca listy
+        if value >= self.tree.verticalScrollBar().maximum():
+            self.load_next_page()
+
     def resume_selected(self):
         item = self.tree.currentItem()
         if not item: return
         match_id = int(item.text(0))
 
-        details = self.db.get_match_details(match_id)
-        meta = self.db.get_match_metadata(match_id)
-        if not details: return
-
-        game_log = []
-        players = set()
-        for row in details:
-            # row: 0=rnd, 1=name, 2=score, 3=m40, 4=m60, 5=m80, 6=m100, 7=is_decl, 8=decl_pts
-            players.add(row[1])
-            is_decl = 0
-            decl_pts = 0
-            if len(row) > 7:
-                is_decl = row[7]
-                decl_pts = row[8]
-
-            game_log.append({
-                'round': row[0], 'player': row[1], 'score': row[2],
-                'melds': {'40': row[3], '60': row[4], '80': row[5], '100': row[6]},
-                'is_declaration': is_decl,
-                'declared_points': decl_pts
-            })
-        player_names = sorted(list(players))
+        self.db.submit("get_match_snapshot", match_id,
+                       callback=lambda snapshot: self.on_resume_loaded(match_id, snapshot))
 
-        self.main_window.resume_game(player_names, match_id, game_log, dealer_offset=meta['dealer_offset'])
+    def on_resume_loaded(self, match_id, snapshot):
+        if not snapshot: return
+        self.main_window.resume_game(match_id, snapshot)
         self.close()
 
     def finish_selected(self):
         item = self.tree.currentItem()
         if not item: return
         match_id = int(item.text(0))
+        self.db.submit("get_match_summary", match_id,
+                       callback=lambda summary: self.on_finish_loaded(match_id, summary))
 
-        details = self.db.get_match_details(match_id)
-        total_abs_score = sum([abs(row[2]) for row in details])
+    def on_finish_loaded(self, match_id, summary):
+        if summary is None: return
 
-        if total_abs_score == 0:
+        if not summary['has_points']:
             if QMessageBox.question(self, "Porzucić?", "Ta gra ma zerowy wynik. Czy usunąć ją trwale?",
                                     QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-                self.db.delete_match(match_id)
-                self.refresh_list()
+                self.db.submit("delete_match", match_id, callback=lambda _: self.refresh_list())
             return
 
-        scores = {}
-        for row in details: scores[row[1]] = scores.get(row[1], 0) + row[2]
+        scores = dict(sorted((name, total) for name, total, _ in summary['players']))
         winner = max(scores, key=scores.get)
         max_s = scores[winner]
 
         if QMessageBox.question(self, "Zakończyć?", f"Lider: {winner} ({max_s} pkt).\nZakończyć i przenieść do archiwum?",
                                 QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-            self.db.force_finish_match(match_id, winner)
+            self.db.submit("force_finish_match", match_id, winner)
             QMessageBox.information(self, "Sukces", f"Gra zakończona. Zwycięzca: {winner}")
             self.refresh_list()
             self.main_window.menu_widget.refresh_data()
 
 
+# ==========================================
+# OKNO DIALOGOWE: POJEDYNKI, SKŁADY I KARIERA
+# ==========================================
+def percent(part, whole):
+    return f"{round(100 * part / whole)}%"
+
+
+class HeadToHeadModel(QAbstractTableModel):
+    # Macierz gracz (wiersz) kontra rywal (kolumna). Tekst komórek powstaje dopiero przy rysowaniu
+    # widocznego fragmentu - setki graczy to tylko słownik par, bez tworzenia widgetów.
+    # Metryki: (nazwa, tekst z (mecze, wygrane, przed rywalem, suma przewagi, suma rozdań), czy procent)
+    METRICS = (
+        ("Przed rywalem", lambda s: percent(s[2], s[0]), True),
+        ("Wygrane mecze", lambda s: percent(s[1], s[0]), True),
+        ("Średnia przewaga", lambda s: f"{s[3] / s[0]:+.0f}", False),
+        ("Średnio rozdań", lambda s: f"{s[4] / s[0]:.1f}", False),
+        ("Wspólne mecze", lambda s: str(s[0]), False),
+    )
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.players = []
+        self.pairs = {}
+        self.metric = 0
+
+    def reset(self, players, pairs):
+        self.beginResetModel()
+        self.players = [name for name, _ in players]
+        self.pairs = {(row[0], row[1]): row[2:] for row in pairs}
+        self.endResetModel()
+
+    def set_metric(self, metric):
+        self.metric = metric
+        if self.players:
+            last = len(self.players) - 1
+            self.dataChanged.emit(self.index(0, 0), self.index(last, last))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.players)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.players)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        if role == Qt.TextAlignmentRole: return Qt.AlignCenter
+        player, rival = self.players[index.row()], self.players[index.column()]
+        stats = self.pairs.get((player, rival))
+        if role == Qt.DisplayRole:
+            if player == rival: return "—"
+            return self.METRICS[self.metric][1](stats) if stats else ""
+        if stats is None: return None
+        games, wins, ahead, margin, deals = stats
+        if role == Qt.ToolTipRole:
+            return (f"{player} kontra {rival}\nWspólne mecze: {games}\n"
+                    f"Przed rywalem: {ahead} ({percent(ahead, games)})\n"
+                    f"Wygrane mecze: {wins} ({percent(wins, games)})\n"
+                    f"Średnia przewaga: {margin / games:+.0f} pkt\nŚrednio rozdań: {deals / games:.1f}")
+        if role == Qt.BackgroundRole and self.METRICS[self.metric][2]:
+            # Zielony - gracz zwykle przed rywalem, czerwony - zwykle za nim
+            rate = (ahead if self.metric == 0 else wins) / games
+            color = QColor("#4CAF50") if rate >= 0.5 else QColor("#F44336")
+            color.setAlpha(int(abs(rate - 0.5) * 2 * 120))
+            return color
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole: return None
+        return self.players[section]
+
+
+class LineupModel(QAbstractTableModel):
+    # Składy stołu (dokładnie ci sami gracze), sortowanie w pamięci - domyślnie najdłuższe mecze
+    HEADERS = ["Skład", "Mecze", "Średnio rozdań", "Wygrane"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.sort_column = 2
+        self.descending = True
+
+    def reset(self, lineups):
+        # lineups: wiersze (skład, gracz, mecze, wygrane, suma przewagi, suma rozdań) posortowane po składzie
+        rows = []
+        for lineup, group in itertools.groupby(lineups, key=lambda row: row[0]):
+            group = list(group)
+            games, deals = group[0][2], group[0][5]
+            wins = sorted(((row[3], row[1]) for row in group), reverse=True)
+            rows.append((" · ".join(lineup.split(LINEUP_SEP)), games, deals / games,
+                         ", ".join(f"{name} {count}" for count, name in wins)))
+        self.beginResetModel()
+        self.rows = rows
+        self.sort_rows()
+        self.endResetModel()
+
+    def sort_rows(self):
+        self.rows.sort(key=lambda row: (row[self.sort_column], row[0]), reverse=self.descending)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole: return None
+        value = self.rows[index.row()][index.column()]
+        return f"{value:.1f}" if index.column() == 2 else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column
+        self.descending = order == Qt.DescendingOrder
+        self.sort_rows()
+        self.layoutChanged.emit()
+
+
+class HeadToHeadDialog(QDialog):
+    def __init__(self, parent, db):
+        super().__init__(parent)
+        self.db = db
+        self.setWindowTitle("Pojedynki, składy i kariera")
+        self.resize(900, 600)
+
+        layout = QVBoxLayout(self)
+        tabs = QTabWidget()
+
+        matrix_page = QWidget()
+        matrix_layout = QVBoxLayout(matrix_page)
+        metric_row = QHBoxLayout()
+        metric_row.addWidget(QLabel("Wiersz kontra kolumna:"))
+        self.metric_combo = QComboBox()
+        for label, _, _ in HeadToHeadModel.METRICS:
+            self.metric_combo.addItem(label)
+        metric_row.addWidget(self.metric_combo, 1)
+        matrix_layout.addLayout(metric_row)
+
+        self.matrix_model = HeadToHeadModel(self)
+        self.metric_combo.currentIndexChanged.connect(self.matrix_model.set_metric)
+        self.matrix = QTableView()
+        self.matrix.setModel(self.matrix_model)
+        # Stałe rozmiary sekcji - bez mierzenia tekstu wszystkich komórek przy setkach graczy
+        self.matrix.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.matrix.horizontalHeader().setDefaultSectionSize(90)
+        self.matrix.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        matrix_layout.addWidget(self.matrix)
+        tabs.addTab(matrix_page, "Gracz kontra gracz")
+
+        self.lineup_model = LineupModel(self)
+        self.lineups = QTreeView()
+        self.lineups.setRootIsDecorated(False)
+        self.lineups.setUniformRowHeights(True)
+        self.lineups.setModel(self.lineup_model)
+        self.lineups.setSortingEnabled(True)
+        self.lineups.sortByColumn(2, Qt.DescendingOrder)
+        self.lineups.setColumnWidth(0, 320)
+        self.lineups.header().setSectionResizeMode(3, QHeaderView.Stretch)
+        tabs.addTab(self.lineups, "Składy stołu")
+
+        # Kariera: suma punktów po kolejnych meczach (tysiące meczów - wykres zmniejszany LTTB)
+        career_page = QWidget()
+        career_layout = QVBoxLayout(career_page)
+        self.career_player = QComboBox()
+        self.career_player.currentTextChanged.connect(self.load_career)
+        career_layout.addWidget(self.career_player)
+        self.career_chart = ScoreChart("Mecz")
+        career_layout.addWidget(self.career_chart, 1)
+        tabs.addTab(career_page, "Kariera gracza")
+        layout.addWidget(tabs)
+
+        btn_close = QPushButton("Zamknij")
+        btn_close.clicked.connect(self.close)
+        layout.addWidget(btn_close)
+
+        # Sumy utrzymywane przy zapisie meczów - tu jeden odczyt gotowych tabel
+        self.db.submit("get_head_to_head", callback=self.on_loaded)
+
+    def on_loaded(self, data):
+        self.matrix_model.reset(data['players'], data['pairs'])
+        self.lineup_model.reset(data['lineups'])
+        self.career_player.addItems([name for name, _ in data['players']])
+
+    def load_career(self, player):
+        if not player: return
+        self.db.submit("get_player_career", player,
+                       callback=lambda points: self.on_career_loaded(player, points))
+
+    def on_career_loaded(self, player, points):
+        if player != self.career_player.currentText(): return  # wybrano już innego gracza
+        self.career_chart.set_series([(player, running_totals(points))])
+
+
 # ==========================================
 # INTERFEJS GRAFICZNY (PySide6)
 # ==========================================
 
+def set_style_state(widget, name, value):
+    # Przełącza stan z APP_STYLESHEET; polish tylko gdy stan faktycznie się zmienił
+    if widget.property(name) == value: return False
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+    return True
+
+
 class PlayerInputWidget(QGroupBox):
     def __init__(self, player_name, parent_game):
         super().__init__(player_name)
@@ -448,18 +1892,149 @@ class PlayerInputWidget(QGroupBox):
         self.cb_declare.setChecked(False)
         self.toggle_declaration_input()
 
+class HistoryModel(QAbstractTableModel):
+    # Widok na ScoreSheet meczu - tekst komórek powstaje dopiero przy rysowaniu widocznych wierszy
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.players = []
+        self.sheet = ScoreSheet(0)
+
+    def reset(self, players, sheet):
+        self.beginResetModel()
+        self.players = list(players)
+        self.sheet = sheet
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.sheet)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.players) + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.TextAlignmentRole: return Qt.AlignCenter
+        if role != Qt.DisplayRole or not index.isValid(): return None
+        if index.column() == 0: return str(index.row() + 1)
+        return str(self.sheet.columns[index.column() - 1][index.row()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal or role != Qt.DisplayRole: return None
+        return "Kol." if section == 0 else self.players[section - 1]
+
+    def row_appended(self):
+        # Match.play już dopisał wiersz do ScoreSheet - informujemy tylko widok
+        row = len(self.sheet) - 1
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.endInsertRows()
+
+
+class ScoreChart(QWidget):
+    # Wykres sum narastających (QPainter). Gotowy obraz trzymany w QPixmapCache - paintEvent przy
+    # przewijaniu / zasłonięciu okna tylko go kopiuje, rysowanie od nowa dopiero po zmianie danych
+    # lub rozmiaru. Długie serie zmniejszane LTTB do ok. jednego punktu na piksel szerokości.
+    COLORS = ("#2196F3", "#F44336", "#4CAF50", "#FF9800", "#9C27B0", "#795548")
+    MARGINS = (55, 28, 12, 24)  # lewy, górny (legenda), prawy, dolny
+
+    def __init__(self, x_label="Rozdanie", parent=None):
+        super().__init__(parent)
+        self.x_label = x_label
+        self.series = []  # [(nazwa, [suma po kolejnych rozdaniach / meczach])]
+        self.target = None
+        self.version = 0
+        self.cache_key = None
+        self.sampled = (None, [])  # (szerokość wykresu, serie po LTTB)
+        self.setMinimumHeight(180)
+
+    def set_series(self, series, target=None):
+        self.series = [(name, list(values)) for name, values in series]
+        self.target = target
+        self.version += 1
+        self.sampled = (None, [])
+        self.update()
+
+    def paintEvent(self, event):
+        key = f"score_chart_{id(self)}_{self.version}_{self.width()}x{self.height()}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            if self.cache_key: QPixmapCache.remove(self.cache_key)
+            pixmap = self.render_chart()
+            QPixmapCache.insert(key, pixmap)
+            self.cache_key = key
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, pixmap)
+        painter.end()
+
+    def sampled_series(self, plot_width):
+        if self.sampled[0] != plot_width:
+            self.sampled = (plot_width, [lttb(values, plot_width) for _, values in self.series])
+        return self.sampled[1]
+
+    def render_chart(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, int(self.width() * ratio)), max(1, int(self.height() * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        left, top, right, bottom = self.MARGINS
+        plot_w = self.width() - left - right
+        plot_h = self.height() - top - bottom
+        if plot_w < 10 or plot_h < 10 or not any(len(values) > 1 for _, values in self.series):
+            return pixmap
+
+        values = [v for _, vals in self.series for v in vals]
+        lo, hi = min(values + [0]), max(values + [0])
+        if self.target is not None and hi >= self.target * 0.8: hi = max(hi, self.target)
+        if hi == lo: hi = lo + 1
+        span_x = max(len(vals) for _, vals in self.series) - 1
+
+        def to_point(x, y):
+            return QPointF(left + plot_w * x / span_x, top + plot_h * (hi - y) / (hi - lo))
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(QFont("Arial", 9))
+        text_color = self.palette().windowText().color()
+        grid = QColor(text_color)
+        grid.setAlpha(60)
+        painter.setPen(QPen(grid, 1))
+        painter.drawLine(to_point(0, 0), to_point(span_x, 0))
+        if self.target is not None and lo <= self.target <= hi:
+            painter.setPen(QPen(grid, 1, Qt.DashLine))
+            painter.drawLine(to_point(0, self.target), to_point(span_x, self.target))
+
+        painter.setPen(text_color)
+        painter.drawText(QRectF(0, top - 7, left - 6, 14), Qt.AlignRight, str(hi))
+        painter.drawText(QRectF(0, top + plot_h - 7, left - 6, 14), Qt.AlignRight, str(lo))
+        painter.drawText(QRectF(left, top + plot_h + 4, plot_w, 16), Qt.AlignRight, f"{self.x_label}: {span_x}")
+
+        legend_x = left
+        for i, ((name, _), points) in enumerate(zip(self.series, self.sampled_series(plot_w))):
+            color = QColor(self.COLORS[i % len(self.COLORS)])
+            painter.setPen(QPen(color, 2))
+            painter.drawPolyline(QPolygonF([to_point(x, y) for x, y in points]))
+            painter.drawLine(QPointF(legend_x, 10), QPointF(legend_x + 14, 10))
+            painter.setPen(text_color)
+            painter.drawText(QRectF(legend_x + 18, 3, 150, 14), Qt.AlignLeft, name)
+            legend_x += 30 + painter.fontMetrics().horizontalAdvance(name)
+        painter.end()
+        return pixmap
+
+
 class GameWidget(QWidget):
     # ... __init__ i setup_ui BEZ ZMIAN ...
-    def __init__(self, main_window, db):
+    def __init__(self, main_window, db, journal=None, odds=None):
         super().__init__()
         self.main_window = main_window
         self.db = db
+        self.journal = journal
+        # Szanse na wygraną (OddsWorker) i próbki z archiwum pobrane raz na skład graczy
+        self.odds = odds
+        self.score_samples = {}
+        if odds is not None: odds.result_ready.connect(self.on_odds_ready)
         self.players_data = []
-        self.round_number = 1
-        self.game_log = []
-        self.current_match_id = None
-        self.dealer_offset = 0
+        self.match = None
+        self.match_ref = MatchRef()
         self.input_widgets = []
+        self.last_repolish_count = 0
         self.setup_ui()
 
     def setup_ui(self):
@@ -489,12 +2064,15 @@ class GameWidget(QWidget):
         btn_layout.addWidget(self.btn_submit)
         btn_layout.addWidget(btn_stop)
         layout.addLayout(btn_layout)
-        layout.addWidget(QLabel("Historia (na bieżąco):"))
-        self.history_tree = QTreeWidget()
-        self.history_tree.setHeaderLabels(["Kol."])
+        self.history_tabs = QTabWidget()
+        self.history_model = HistoryModel(self)
+        self.history_tree = QTreeView()
+        self.history_tree.setModel(self.history_model)
+        self.history_tree.setRootIsDecorated(False)
+        self.history_tree.setUniformRowHeights(True)
         self.history_tree.setStyleSheet("""
-            QTreeWidget { font-size: 16px; font-weight: bold; }
-            QTreeWidget::item { padding-top: 5px; padding-bottom: 5px; height: 35px; }
+            QTreeView { font-size: 16px; font-weight: bold; }
+            QTreeView::item { padding-top: 5px; padding-bottom: 5px; height: 35px; }
             QHeaderView::section { font-size: 16px; font-weight: bold; padding: 5px; }
         """)
         header = self.history_tree.header()
@@ -502,23 +2080,28 @@ class GameWidget(QWidget):
         header.setSectionResizeMode(0, QHeaderView.Fixed)
         self.history_tree.setColumnWidth(0, 70)
         header.setDefaultAlignment(Qt.AlignCenter)
-        layout.addWidget(self.history_tree)
+        self.history_tabs.addTab(self.history_tree, "Historia (na bieżąco)")
+        self.chart = ScoreChart()
+        self.history_tabs.addTab(self.chart, "Wykres")
+        layout.addWidget(self.history_tabs)
 
-    def initialize_game(self, player_names, match_id=None, existing_log=None, dealer_offset=0):
+    def initialize_game(self, player_names, match_id=None, snapshot=None, dealer_offset=0):
         for i in reversed(range(self.scores_layout.count())):
             self.scores_layout.itemAt(i).widget().setParent(None)
         for i in reversed(range(self.input_layout.count())):
             self.input_layout.itemAt(i).widget().setParent(None)
-        self.history_tree.clear()
 
-        self.current_match_id = match_id
-        self.dealer_offset = dealer_offset
+        self.match_ref = MatchRef(match_id)
         self.players_data = []
         self.input_widgets = []
 
-        cols = ["Kol."] + player_names
-        self.history_tree.setColumnCount(len(cols))
-        self.history_tree.setHeaderLabels(cols)
+        if snapshot:
+            # Sumy z podsumowania meczu, historia jako kolumny - bez przeliczania rozdań
+            self.match = Match.from_snapshot(player_names, snapshot['totals'], snapshot['sheet'], dealer_offset)
+        else:
+            self.match = Match(player_names, dealer_offset)
+        self.history_model.reset(player_names, self.match.sheet)
+        if self.journal: self.journal.start(player_names, dealer_offset, match_id)
 
         header = self.history_tree.header()
         header.setSectionResizeMode(QHeaderView.Stretch)
@@ -528,28 +2111,33 @@ class GameWidget(QWidget):
         # Tworzenie widgetów graczy
         for name in player_names:
             score_card = QGroupBox()
-            score_card.setStyleSheet("QGroupBox { border: 2px solid gray; border-radius: 5px; margin-top: 1ex; } QGroupBox::title { subcontrol-origin: margin; subcontrol-position: top center; padding: 0 3px; }")
+            score_card.setProperty("role", "score_card")
+            score_card.setProperty("dealer", False)
             vbox = QVBoxLayout()
             lbl_name = QLabel(name)
-            lbl_name.setStyleSheet("font-size: 22px; font-weight: bold;")
             lbl_name.setAlignment(Qt.AlignCenter)
             lbl_name.setProperty("role", "name_label")
             lbl_score = QLabel("0")
-            lbl_score.setStyleSheet("font-size: 70px; font-weight: bold; color: #2196F3;")
+            lbl_score.setProperty("role", "score_label")
+            lbl_score.setProperty("underLine", False)
             lbl_score.setAlignment(Qt.AlignCenter)
             lbl_status = QLabel("")
             lbl_status.setFont(QFont("Arial", 12, italic=True))
             lbl_status.setAlignment(Qt.AlignCenter)
-            lbl_status.setStyleSheet("color: #F44336;")
+            lbl_status.setProperty("role", "status_label")
+            lbl_odds = QLabel("")
+            lbl_odds.setAlignment(Qt.AlignCenter)
+            lbl_odds.setProperty("role", "odds_label")
             vbox.addWidget(lbl_name)
             vbox.addWidget(lbl_score)
             vbox.addWidget(lbl_status)
+            vbox.addWidget(lbl_odds)
             score_card.setLayout(vbox)
             self.scores_layout.addWidget(score_card)
 
             self.players_data.append({
-                'name': name, 'score': 0, 'lbl_name': lbl_name, 'lbl_score': lbl_score,
-                'lbl_status': lbl_status, 'card_widget': score_card
+                'name': name, 'lbl_name': lbl_name, 'lbl_score': lbl_score,
+                'lbl_status': lbl_status, 'lbl_odds': lbl_odds, 'card_widget': score_card
             })
 
             inp = PlayerInputWidget(name, self)
@@ -565,43 +2153,14 @@ class GameWidget(QWidget):
         if self.input_widgets:
             QWidget.setTabOrder(self.input_widgets[-1].score_input, self.btn_submit)
 
-        if existing_log:
-            self.game_log = []
-            players_map = {p['name']: p for p in self.players_data}
-            max_round = 0
-            rounds_map = {}
-            for entry in existing_log:
-                r = entry['round']
-                if r not in rounds_map: rounds_map[r] = {}
-                rounds_map[r][entry['player']] = entry
-                players_map[entry['player']]['score'] += entry['score']
-                if r > max_round: max_round = r
-            self.round_number = max_round + 1
-            self.game_log = existing_log
-            for r in sorted(rounds_map.keys()):
-                row_data = [str(r)]
-                for p in self.players_data:
-                    if p['name'] in rounds_map[r]: row_data.append(str(rounds_map[r][p['name']]['score']))
-                    else: row_data.append("0")
-                item = QTreeWidgetItem(row_data)
-                for i in range(len(row_data)):
-                    item.setTextAlignment(i, Qt.AlignCenter)
-                self.history_tree.addTopLevelItem(item)
-        else:
-            self.round_number = 1
-            self.game_log = []
-
         self.update_visuals()
+        self.request_odds()
         if self.input_widgets: self.input_widgets[0].score_input.setFocus()
 
     # ... RESZTA METOD (update_meld_constraints, process_round itp.) BEZ ZMIAN ...
     def update_meld_constraints(self):
-        holders = {'40': None, '60': None, '80': None, '100': None}
-        for inp in self.input_widgets:
-            if inp.cb_40.isChecked(): holders['40'] = inp
-            if inp.cb_60.isChecked(): holders['60'] = inp
-            if inp.cb_80.isChecked(): holders['80'] = inp
-            if inp.cb_100.isChecked(): holders['100'] = inp
+        holder_idx = meld_holders([inp.get_data()[1] for inp in self.input_widgets])
+        holders = {suit: (self.input_widgets[idx] if idx is not None else None) for suit, idx in holder_idx.items()}
         for inp in self.input_widgets:
             if holders['40'] is not None and holders['40'] != inp:
                 inp.cb_40.setEnabled(False); inp.cb_40.setChecked(False)
@@ -623,147 +2182,232 @@ class GameWidget(QWidget):
                 inp.toggle_declaration_input()
 
     def update_visuals(self):
-        self.lbl_round.setText(f"Rozdanie: {self.round_number}")
-        dealer_idx = (self.round_number - 1 + self.dealer_offset) % len(self.players_data)
+        self.lbl_round.setText(f"Rozdanie: {self.match.round_number}")
+        dealer_idx = self.match.dealer_index()
+        repolished = 0
         for i, p in enumerate(self.players_data):
-            if i == dealer_idx:
-                p['lbl_name'].setText(f"🎴 {p['name']} (Rozdaje)")
-                p['card_widget'].setStyleSheet("""
-                    QGroupBox { border: 2px solid #FFD700; background-color: rgba(255, 215, 0, 0.1);
-                        border-radius: 5px; margin-top: 1ex; }
-                """)
-            else:
-                p['lbl_name'].setText(p['name'])
-                p['card_widget'].setStyleSheet("QGroupBox { border: 2px solid gray; border-radius: 5px; margin-top: 1ex; }")
-            p['lbl_score'].setText(str(p['score']))
-            if p['score'] >= 800:
-                p['lbl_score'].setStyleSheet("font-size: 70px; font-weight: bold; color: #F44336;")
-                p['lbl_status'].setText("(Pod kreską!)")
-            else:
-                p['lbl_score'].setStyleSheet("font-size: 70px; font-weight: bold; color: #2196F3;")
-                p['lbl_status'].setText("")
+            is_dealer = i == dealer_idx
+            under_line = self.match.is_under_line(i)
+            p['lbl_name'].setText(f"🎴 {p['name']} (Rozdaje)" if is_dealer else p['name'])
+            p['lbl_score'].setText(str(self.match.scores[i]))
+            p['lbl_status'].setText("(Pod kreską!)" if under_line else "")
+            repolished += set_style_state(p['card_widget'], "dealer", is_dealer)
+            repolished += set_style_state(p['lbl_score'], "underLine", under_line)
+        self.last_repolish_count = repolished
+        # Nowe dane wykresu - obraz rysowany dopiero, gdy zakładka jest widoczna
+        self.chart.set_series([(name, running_totals(column))
+                               for name, column in zip(self.match.players, self.match.sheet.columns)], WIN_SCORE)
+        if STYLE_DEBUG:
+            self.main_window.statusBar().showMessage(f"Przerysowania stylu w tym rozdaniu: {repolished}", 5000)
         self.history_tree.scrollToBottom()
 
-    def round_points(self, points):
-        if points < 0: return points
-        return ((points + 5) // 10) * 10
-
     def process_round(self):
-        round_data_list = []
-        for i, inp in enumerate(self.input_widgets):
+        entries = []
+        for inp in self.input_widgets:
             pts, melds, is_decl, decl_val = inp.get_data()
-            round_data_list.append({
-                'pts_cards_raw': pts,
-                'melds': melds,
-                'is_declaring': is_decl,
-                'decl_val': decl_val
-            })
+            entries.append(DealEntry(inp.player_name, pts, melds, is_decl, decl_val))
 
-        total_input_score = sum(d['pts_cards_raw'] for d in round_data_list)
-        total_melds_active = sum(1 for d in round_data_list for m in d['melds'].values() if m)
-        if total_input_score == 0 and total_melds_active == 0 and not any(d['is_declaring'] for d in round_data_list):
+        total_input_score = sum(e.cards for e in entries)
+        total_melds_active = sum(1 for e in entries for m in e.melds.values() if m)
+        if total_input_score == 0 and total_melds_active == 0 and not any(e.is_declaration for e in entries):
              if QMessageBox.question(self, "Puste rozdanie?",
                                      "Wszyscy mają 0 punktów. Czy na pewno chcesz zapisać takie rozdanie?",
                                      QMessageBox.Yes | QMessageBox.No) == QMessageBox.No:
                  return
 
-        winner_found = None
-        hist_row = [str(self.round_number)]
-        for idx, data in enumerate(round_data_list):
-            p_data = self.players_data[idx]
-            meld_points = 0
-            if data['melds']['40']: meld_points += 40
-            if data['melds']['60']: meld_points += 60
-            if data['melds']['80']: meld_points += 80
-            if data['melds']['100']: meld_points += 100
-            final_score_change = 0
-            if data['is_declaring']:
-                ugrane_dokladnie = data['pts_cards_raw'] + meld_points
-                if ugrane_dokladnie >= data['decl_val']:
-                    final_score_change = data['decl_val']
-                else:
-                    final_score_change = -data['decl_val']
-            else:
-                pts_rounded = self.round_points(data['pts_cards_raw'])
-                ugrane_lacznie = pts_rounded + meld_points
-                final_score_change = ugrane_lacznie
-            p_data['score'] += final_score_change
-            hist_row.append(str(final_score_change))
-            self.game_log.append({
-                'round': self.round_number,
-                'player': p_data['name'],
-                'score': final_score_change,
-                'melds': data['melds'],
-                'is_declaration': 1 if data['is_declaring'] else 0,
-                'declared_points': data['decl_val']
-            })
-            if p_data['score'] >= 1000: winner_found = p_data['name']
-            self.input_widgets[idx].clear_data()
-
-        item = QTreeWidgetItem(hist_row)
-        for i in range(len(hist_row)):
-            item.setTextAlignment(i, Qt.AlignCenter)
-        self.history_tree.addTopLevelItem(item)
-        self.current_match_id = self.db.save_or_update_game(
-            self.current_match_id, None, self.game_log, status="paused", dealer_offset=self.dealer_offset
-        )
-        if winner_found:
-            self.update_visuals()
-            self.end_game(winner_found)
-        else:
-            self.round_number += 1
-            self.update_visuals()
-            if self.input_widgets: self.input_widgets[0].score_input.setFocus()
+        try:
+            self.match.play(entries)
+        except ValueError as e:
+            QMessageBox.warning(self, "Błąd", str(e))
+            return
+
+        for inp in self.input_widgets:
+            inp.clear_data()
+
+        self.history_model.row_appended()
+        # Najpierw dziennik (jeden write), potem w tle dopisanie rozdania do bazy
+        deal_log = self.match.log.snapshot(-len(self.match.players))
+        round_number = len(self.match.sheet)
+        match_ref = self.match_ref
+        if self.journal: self.journal.append_deal(round_number, deal_log.data)
+        self.db.submit("append_rounds", match_ref, deal_log, dealer_offset=self.match.dealer_offset,
+                       callback=lambda match_id: self.on_deal_saved(match_ref, match_id, round_number))
+        self.update_visuals()
+        self.request_odds()
+        if self.match.winner:
+            self.end_game(self.match.winner)
+        elif self.input_widgets:
+            self.input_widgets[0].score_input.setFocus()
+
+    def request_odds(self):
+        # Po każdym rozdaniu: próbki z archiwum (raz na skład), symulacja w OddsWorker
+        if self.odds is None or self.match is None: return
+        if self.match.winner:
+            self.odds.cancel()
+            return
+        key = frozenset(self.match.players)
+        samples = self.score_samples.get(key)
+        if samples is None:
+            if key in self.score_samples: return  # próbki już w drodze
+            self.score_samples[key] = None
+            self.odds.cancel()
+            self.db.submit("get_score_samples", list(self.match.players),
+                           callback=lambda result: self.on_score_samples(key, result))
+            return
+        self.odds.request(self.match.players, self.match.scores, samples)
+
+    def on_score_samples(self, key, samples):
+        self.score_samples[key] = samples
+        if self.match is not None and frozenset(self.match.players) == key:
+            self.request_odds()
+
+    def on_odds_ready(self, generation, probs):
+        if generation != self.odds.generation: return
+        for i, p in enumerate(self.players_data):
+            p['lbl_odds'].setText(f"Szansa na wygraną: {probs[i] * 100:.0f}%" if probs else "")
+
+    def on_deal_saved(self, match_ref, match_id, round_number):
+        # Potwierdzenie z wątku bazy - tylko dla bieżącego meczu (po rewanżu dziennik jest już nowy)
+        if self.journal and match_ref is self.match_ref:
+            self.journal.mark_committed(match_id, round_number)
 
     def has_any_points(self):
-        for p in self.players_data:
-            if p['score'] != 0: return True
-        return False
+        return self.match.has_any_points()
+
+    def discard_match(self):
+        self.db.submit("delete_match", self.match_ref)
+        if self.journal: self.journal.clear()
 
     def pause_game(self):
         if not self.has_any_points():
             if QMessageBox.question(self, "Porzucić?", "Gra ma zerowy wynik. Czy usunąć ją?",
                                     QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-                if self.current_match_id: self.db.delete_match(self.current_match_id)
+                self.discard_match()
                 self.main_window.show_menu()
             return
         if QMessageBox.question(self, "Wstrzymaj", "Zapisać i wrócić do menu?",
                                 QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-            self.db.save_or_update_game(self.current_match_id, None, self.game_log, status="paused", dealer_offset=self.dealer_offset)
+            self.save_match_state(None, "paused")
             self.main_window.show_menu()
 
     def force_stop_game(self):
         if not self.has_any_points():
             if QMessageBox.question(self, "Porzucić?", "Brak punktów. Porzucić grę?",
                                     QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-                if self.current_match_id: self.db.delete_match(self.current_match_id)
+                self.discard_match()
                 self.main_window.show_menu()
             return
         if QMessageBox.question(self, "Zakończ", "Zakończyć grę teraz?",
                                 QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-            winner = max(self.players_data, key=lambda p: p['score'])
-            self.end_game(winner['name'])
+            self.end_game(self.match.leader())
+
+    def save_match_state(self, winner, status):
+        # Rozdania są już zapisane przez append_rounds - zmieniamy tylko stan meczu
+        if self.journal: self.journal.clear()
+        if self.match_ref.id is None and not self.match.log:
+            return
+        self.db.submit("set_match_status", self.match_ref, status, winner)
 
     def end_game(self, winner_name):
-        self.db.save_or_update_game(self.current_match_id, winner_name, self.game_log, status="finished", dealer_offset=self.dealer_offset)
+        self.save_match_state(winner_name, "finished")
         msg = QMessageBox()
         msg.setWindowTitle("Koniec Gry")
         msg.setText(f"Gratulacje! Wygrał gracz: {winner_name} 🏆")
         msg.setInformativeText("Czy chcesz zagrać REWANŻ w tym samym składzie?")
         msg.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
         if msg.exec() == QMessageBox.Yes:
-            names = [p['name'] for p in self.players_data]
+            names = list(self.match.players)
             new_offset = random.randint(0, len(names) - 1)
-            self.initialize_game(names, match_id=None, existing_log=None, dealer_offset=new_offset)
+            self.initialize_game(names, match_id=None, snapshot=None, dealer_offset=new_offset)
         else:
             self.main_window.show_menu()
 
 
+class ArchiveModel(QAbstractTableModel):
+    # Model archiwum doczytujący mecze stronami (canFetchMore/fetchMore) prosto z bazy
+    PAGE_SIZE = 100
+    HEADERS = ["ID", "Data", "Zwycięzca"]
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.rows = []
+        self.has_more = True
+        self.loading = False
+        self.generation = 0
+        self.sort_column = 0
+        self.descending = True
+        self.filters = {'player': None, 'date_from': None, 'date_to': None}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole: return None
+        value = self.rows[index.row()][index.column()]
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.loading: return
+        self.loading = True
+        after = (self.rows[-1][3], self.rows[-1][0]) if self.rows else None
+        generation = self.generation
+        self.db.submit("get_history_page", after, self.PAGE_SIZE, self.sort_column, self.descending,
+                       callback=lambda page: self.on_page_loaded(generation, page), **self.filters)
+
+    def on_page_loaded(self, generation, page):
+        if generation != self.generation: return  # model zresetowany w międzyczasie
+        self.loading = False
+        self.has_more = len(page) == self.PAGE_SIZE
+        if not page: return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.descending = order == Qt.DescendingOrder
+        self.refresh()
+
+    def set_filters(self, player=None, date_from=None, date_to=None):
+        self.filters = {'player': player or None, 'date_from': date_from, 'date_to': date_to}
+        self.refresh()
+
+    def refresh(self):
+        # Reset modelu - widok sam dociągnie pierwszą stronę
+        self.beginResetModel()
+        self.generation += 1
+        self.rows = []
+        self.has_more = True
+        self.loading = False
+        self.endResetModel()
+
+    def match_id(self, row):
+        return self.rows[row][0]
+
+    def match_date(self, row):
+        return self.rows[row][1]
+
+
 class MenuWidget(QWidget):
     def __init__(self, main_window, db):
         super().__init__()
         self.main_window = main_window
         self.db = db
+        # Jedna lista graczy dla wszystkich pól (ranking: częstość + świeżość gry)
+        self.player_names_model = QStringListModel(self)
+        self.player_names_version = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -813,6 +2457,27 @@ class MenuWidget(QWidget):
         lbl_ranking.setFont(QFont("Arial", 14, QFont.Weight.Bold))
         left_layout.addWidget(lbl_ranking)
 
+        # Okres rankingów: cały czas, ostatnie dni, sezony (lata) albo własny zakres dat
+        window_row = QHBoxLayout()
+        self.ranking_window = QComboBox()
+        self.ranking_window.addItem("Cały czas", None)
+        for days, label in RANKING_WINDOWS:
+            self.ranking_window.addItem(label, days)
+        self.ranking_window.addItem("Własny zakres...", "custom")
+        self.ranking_window.currentIndexChanged.connect(self.on_ranking_window_changed)
+        window_row.addWidget(self.ranking_window, 1)
+        self.season_years = []
+        self.ranking_from = QDateEdit()
+        self.ranking_to = QDateEdit()
+        for date_edit in (self.ranking_from, self.ranking_to):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setDate(QDate.currentDate())
+            date_edit.setVisible(False)
+            date_edit.dateChanged.connect(self.refresh_leaderboards)
+            window_row.addWidget(date_edit)
+        left_layout.addLayout(window_row)
+
         gb_leaders = QGroupBox()
         gb_leaders.setMinimumWidth(350)
 
@@ -826,6 +2491,18 @@ class MenuWidget(QWidget):
             QTreeWidget::item { padding: 3px; }
         """
 
+        self.tree_rating = QTreeWidget()
+        self.tree_rating.setStyleSheet(style_rank)
+        self.setup_leaderboard_tree(self.tree_rating, "Elo")
+        self.tree_rating.setFixedHeight(150)
+
+        lbl_rating = QLabel("<b>Ranking Elo</b>")
+        lbl_rating.setToolTip("Ranking Elo obejmuje całą historię - okres dotyczy pozostałych rankingów")
+        lbl_rating.setAlignment(Qt.AlignCenter)
+        lbl_rating.setFont(QFont("Arial", 12))
+        scroll_layout.addWidget(lbl_rating)
+        scroll_layout.addWidget(self.tree_rating)
+
         self.tree_wins = QTreeWidget()
         self.tree_wins.setStyleSheet(style_rank)
         self.setup_leaderboard_tree(self.tree_wins, "Wygrane")
@@ -867,6 +2544,10 @@ class MenuWidget(QWidget):
         gb_leaders.setLayout(gb_leaders_layout)
 
         left_layout.addWidget(gb_leaders)
+
+        btn_h2h = QPushButton("⚔ Pojedynki, składy i kariera")
+        btn_h2h.clicked.connect(self.show_head_to_head_dialog)
+        left_layout.addWidget(btn_h2h)
         split_layout.addWidget(left_container, 1)
 
         right_container = QWidget()
@@ -880,12 +2561,39 @@ class MenuWidget(QWidget):
         gb_archive = QGroupBox()
         gb_archive.setMinimumWidth(350)
         archive_layout = QVBoxLayout()
-        self.tree_archive = QTreeWidget()
-        self.tree_archive.setHeaderLabels(["ID", "Data", "Zwycięzca"])
+
+        # Filtry archiwum (gracz, zakres dat) - wykonywane po stronie SQL
+        filter_row = QHBoxLayout()
+        self.archive_player_filter = QLineEdit()
+        self.archive_player_filter.setPlaceholderText("Filtruj gracza...")
+        self.archive_player_filter.editingFinished.connect(self.apply_archive_filters)
+        filter_row.addWidget(self.archive_player_filter)
+        self.archive_date_from = QDateEdit()
+        self.archive_date_to = QDateEdit()
+        for date_edit in (self.archive_date_from, self.archive_date_to):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setMinimumDate(QDate(2000, 1, 1))
+            date_edit.setSpecialValueText("—")
+            date_edit.setDate(date_edit.minimumDate())
+            date_edit.dateChanged.connect(self.apply_archive_filters)
+        filter_row.addWidget(QLabel("Od:"))
+        filter_row.addWidget(self.archive_date_from)
+        filter_row.addWidget(QLabel("Do:"))
+        filter_row.addWidget(self.archive_date_to)
+        archive_layout.addLayout(filter_row)
+
+        self.archive_model = ArchiveModel(self.db, self)
+        self.tree_archive = QTreeView()
+        self.tree_archive.setRootIsDecorated(False)
+        self.tree_archive.setUniformRowHeights(True)
+        self.tree_archive.setModel(self.archive_model)
+        self.tree_archive.setSortingEnabled(True)
+        self.tree_archive.sortByColumn(0, Qt.DescendingOrder)
         self.tree_archive.setColumnHidden(0, True)
         self.tree_archive.setColumnWidth(1, 160)
         self.tree_archive.header().setSectionResizeMode(2, QHeaderView.Stretch)
-        self.tree_archive.itemDoubleClicked.connect(self.open_archive_details)
+        self.tree_archive.doubleClicked.connect(self.open_archive_details)
         archive_layout.addWidget(self.tree_archive)
 
         btn_details = QPushButton("Pokaż szczegóły (Raport)")
@@ -909,35 +2617,96 @@ class MenuWidget(QWidget):
         if len(self.player_combos) >= 4: return
         combo = QComboBox()
         combo.setEditable(True)
+        combo.setInsertPolicy(QComboBox.NoInsert)
+        combo.setModel(self.player_names_model)
+        completer = QCompleter(self.player_names_model, combo)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchStartsWith)
+        completer.setModelSorting(QCompleter.UnsortedModel)
+        combo.setCompleter(completer)
+        combo.setCurrentIndex(-1)
         combo.setPlaceholderText(f"Imię {len(self.player_combos)+1}")
         self.player_combos.append(combo)
         self.player_inputs_layout.addWidget(combo)
-        self.refresh_combo_suggestions()
 
     def refresh_data(self):
-        known_players = self.db.get_all_player_names()
-        for cb in self.player_combos:
-            current = cb.currentText()
-            cb.clear()
-            cb.addItems(known_players)
-            cb.setCurrentText(current)
-
-        self.fill_tree(self.tree_wins, self.db.get_top_wins())
-        self.fill_tree(self.tree_melds, self.db.get_top_total_melds())
-        self.fill_tree(self.tree_100, self.db.get_top_100_melds())
-
-        self.tree_archive.clear()
-        hist = self.db.get_history()
-        for mid, date, winner in hist:
-            self.tree_archive.addTopLevelItem(QTreeWidgetItem([str(mid), date, winner]))
+        # Zapytania idą do wątku bazy, drzewka wypełniają się po nadejściu wyników
+        self.refresh_combo_suggestions()
+        for tree in (self.tree_rating, self.tree_wins, self.tree_melds, self.tree_100):
+            if tree.topLevelItemCount() == 0:
+                tree.addTopLevelItem(QTreeWidgetItem(["", "Wczytywanie...", ""]))
+        # Ranking liczony przyrostowo przy zapisie - tu tylko odczyt gotowej tabeli
+        self.db.submit("get_top_ratings", callback=lambda rows: self.fill_tree(self.tree_rating, rows))
+        self.db.submit("get_season_years", callback=self.set_season_years)
+        self.refresh_leaderboards()
+
+        self.archive_model.refresh()
+
+    def refresh_leaderboards(self):
+        # Okres inny niż "Cały czas" - suma dziennych kubełków (player_daily)
+        self.db.submit("get_leaderboards", self.ranking_window_range(), callback=self.fill_leaderboards)
+
+    def fill_leaderboards(self, boards):
+        for tree, rows in zip((self.tree_wins, self.tree_melds, self.tree_100), boards):
+            self.fill_tree(tree, rows)
+
+    def ranking_window_range(self):
+        # (pierwszy dzień, ostatni dzień) jako liczba dni od 1970-01-01, None = cały czas
+        data = self.ranking_window.currentData()
+        if data is None: return None
+        epoch = QDate(1970, 1, 1)
+        if data == "custom":
+            return (epoch.daysTo(self.ranking_from.date()), epoch.daysTo(self.ranking_to.date()))
+        if isinstance(data, tuple):
+            year = data[1]
+            return (epoch.daysTo(QDate(year, 1, 1)), epoch.daysTo(QDate(year, 12, 31)))
+        today = epoch.daysTo(QDate.currentDate())
+        return (today - data + 1, today)
+
+    def on_ranking_window_changed(self):
+        custom = self.ranking_window.currentData() == "custom"
+        self.ranking_from.setVisible(custom)
+        self.ranking_to.setVisible(custom)
+        self.refresh_leaderboards()
+
+    def set_season_years(self, years):
+        if years == self.season_years: return
+        current = self.ranking_window.currentData()
+        self.ranking_window.blockSignals(True)
+        for _ in self.season_years:
+            self.ranking_window.removeItem(len(RANKING_WINDOWS) + 1)
+        for offset, year in enumerate(years):
+            self.ranking_window.insertItem(len(RANKING_WINDOWS) + 1 + offset, f"Sezon {year}", ("season", year))
+        self.season_years = years
+        index = self.ranking_window.findData(current)
+        self.ranking_window.setCurrentIndex(max(index, 0))
+        self.ranking_window.blockSignals(False)
+        if index < 0: self.on_ranking_window_changed()
+
+    def apply_archive_filters(self):
+        date_from = self.archive_date_from.date()
+        date_to = self.archive_date_to.date()
+        no_date = self.archive_date_from.minimumDate()
+        self.archive_model.set_filters(
+            player=self.archive_player_filter.text().strip(),
+            date_from=date_from.toString("yyyy-MM-dd") if date_from != no_date else None,
+            # Górna granica włącznie z wybranym dniem
+            date_to=date_to.addDays(1).toString("yyyy-MM-dd") if date_to != no_date else None,
+        )
 
     def refresh_combo_suggestions(self):
-        known = self.db.get_all_player_names()
-        for cb in self.player_combos:
-            txt = cb.currentText()
-            cb.clear()
-            cb.addItems(known)
-            cb.setCurrentText(txt)
+        # Bez zapisów od ostatniego razu lista jest aktualna - nie pytamy bazy
+        if self.player_names_version == self.db.write_version: return
+        self.player_names_version = self.db.write_version
+        self.db.submit("get_player_suggestions", callback=self.set_known_players)
+
+    def set_known_players(self, known):
+        if known == self.player_names_model.stringList(): return
+        texts = [cb.currentText() for cb in self.player_combos]
+        self.player_names_model.setStringList(known)
+        for cb, txt in zip(self.player_combos, texts):
+            if txt: cb.setCurrentText(txt)
+            else: cb.setCurrentIndex(-1)
 
     def fill_tree(self, tree, data):
         tree.clear()
@@ -961,25 +2730,31 @@ class MenuWidget(QWidget):
         dlg = PausedGamesDialog(self, self.db, self.main_window)
         dlg.exec()
 
+    def show_head_to_head_dialog(self):
+        dlg = HeadToHeadDialog(self, self.db)
+        dlg.exec()
+
     def open_archive_details(self):
-        item = self.tree_archive.currentItem()
-        if not item: return
-        match_id = int(item.text(0))
-        details = self.db.get_match_details(match_id)
-        if not details: return
+        index = self.tree_archive.currentIndex()
+        if not index.isValid(): return
+        match_id = self.archive_model.match_id(index.row())
+        match_date = self.archive_model.match_date(index.row())
+        self.db.submit("get_match_summary", match_id,
+                       callback=lambda summary: self.show_archive_report(match_id, match_date, summary))
 
-        players = sorted(list(set(row[1] for row in details)))
-        player_totals = {p: 0 for p in players}
-        rounds_map = {}
-        for row in details:
-            r_num, p_name, score = row[0], row[1], row[2]
-            player_totals[p_name] += score
-            if r_num not in rounds_map: rounds_map[r_num] = {}
-            rounds_map[r_num][p_name] = score
-        winner = max(player_totals, key=player_totals.get) if player_totals else None
+    def show_archive_report(self, match_id, match_date, summary):
+        if not summary or not summary['players']: return
+        self.build_archive_report(match_id, match_date, summary).exec()
+
+    def build_archive_report(self, match_id, match_date, summary):
+
+        player_totals = dict(sorted((name, total) for name, total, _ in summary['players']))
+        players = list(player_totals)
+        winner = max(player_totals, key=player_totals.get)
+        margin = next(m for name, _, m in summary['players'] if name == winner)
 
         det_dlg = QDialog(self)
-        det_dlg.setWindowTitle(f"Raport meczowy z {item.text(1)}")
+        det_dlg.setWindowTitle(f"Raport meczowy z {match_date}")
         det_dlg.resize(900, 600)
         det_lay = QVBoxLayout(det_dlg)
 
@@ -987,21 +2762,16 @@ class MenuWidget(QWidget):
         sum_lay = QHBoxLayout()
         for p in players:
             total = player_totals[p]
+            is_winner = p == winner
             frame = QFrame()
             frame.setFrameShape(QFrame.StyledPanel)
             f_lay = QVBoxLayout()
-            if p == winner:
-                name_lbl = QLabel(f"🏆 {p}")
-                name_lbl.setStyleSheet("color: #d4af37; font-weight: bold; font-size: 16px;")
-                total_lbl = QLabel(str(total))
-                total_lbl.setStyleSheet("color: #d4af37; font-weight: bold; font-size: 24px;")
-                frame.setStyleSheet("background-color: #1a1a1a; border: 2px solid #d4af37; border-radius: 8px;")
-            else:
-                name_lbl = QLabel(p)
-                name_lbl.setStyleSheet("font-size: 14px;")
-                total_lbl = QLabel(str(total))
-                total_lbl.setStyleSheet("font-size: 20px; font-weight: bold;")
-                frame.setStyleSheet("border: 1px solid gray; border-radius: 8px;")
+            name_lbl = QLabel(f"🏆 {p}" if is_winner else p)
+            total_lbl = QLabel(str(total))
+            # Wygląd z APP_STYLESHEET - właściwości ustawione przed pokazaniem, bez ponownego polerowania
+            for widget, role in ((frame, "summary_frame"), (name_lbl, "summary_name"), (total_lbl, "summary_total")):
+                widget.setProperty("role", role)
+                widget.setProperty("winner", is_winner)
             name_lbl.setAlignment(Qt.AlignCenter)
             total_lbl.setAlignment(Qt.AlignCenter)
             f_lay.addWidget(name_lbl)
@@ -1011,34 +2781,144 @@ class MenuWidget(QWidget):
         summary_group.setLayout(sum_lay)
         det_lay.addWidget(summary_group)
 
+        minutes = summary['duration'] // 60
+        duration_txt = f"{minutes // 60}:{minutes % 60:02d} h" if summary['duration'] else "brak danych"
+        det_lay.addWidget(QLabel(f"Rozdań: {summary['rounds']}   |   Czas gry: {duration_txt}   |   "
+                                 f"Przewaga zwycięzcy: {margin} pkt"))
+
+        # Wykres i tabela rozdań wczytywane dopiero po rozwinięciu (rozdania pobierane raz, dla obu)
+        btn_chart = QPushButton("Pokaż wykres")
+        btn_chart.setCheckable(True)
+        det_lay.addWidget(btn_chart)
+        chart = ScoreChart()
+        chart.setMinimumHeight(220)
+        chart.setVisible(False)
+        det_lay.addWidget(chart)
+
+        btn_rounds = QPushButton("Pokaż rozdania")
+        btn_rounds.setCheckable(True)
+        det_lay.addWidget(btn_rounds)
+
         det_tree = QTreeWidget()
-        cols = ["Runda"] + players
-        det_tree.setHeaderLabels(cols)
-        for r_num in sorted(rounds_map.keys()):
-            row_data = [str(r_num)]
-            for p in players: row_data.append(str(rounds_map[r_num].get(p, 0)))
-            det_tree.addTopLevelItem(QTreeWidgetItem(row_data))
-        sum_row = ["SUMA"]
-        for p in players: sum_row.append(str(player_totals[p]))
-        sum_item = QTreeWidgetItem(sum_row)
-        for i in range(len(sum_row)):
+        det_tree.setHeaderLabels(["Runda"] + players)
+        sum_item = QTreeWidgetItem(["SUMA"] + [str(player_totals[p]) for p in players])
+        for i in range(len(players) + 1):
             sum_item.setFont(i, QFont("Arial", 10, QFont.Weight.Bold))
             sum_item.setForeground(i, QColor("#2196F3"))
         det_tree.addTopLevelItem(sum_item)
+        det_tree.setVisible(False)
         det_lay.addWidget(det_tree)
-        det_dlg.exec()
+        det_lay.addStretch()
+        rounds_map = {}
+
+        def load_rounds():
+            if det_dlg.property("rounds_requested"): return
+            det_dlg.setProperty("rounds_requested", True)
+            self.db.submit("get_match_details", match_id, callback=on_details)
+
+        def on_details(details):
+            for row in details:
+                rounds_map.setdefault(row[0], {})[row[1]] = row[2]
+            chart.set_series([(p, running_totals(rounds_map[r].get(p, 0) for r in sorted(rounds_map)))
+                              for p in players], WIN_SCORE)
+            if btn_rounds.isChecked(): fill_rounds()
+
+        def fill_rounds():
+            if det_tree.property("loaded") or not rounds_map: return
+            det_tree.setProperty("loaded", True)
+            items = []
+            for r_num in sorted(rounds_map.keys()):
+                row_data = [str(r_num)]
+                for p in players: row_data.append(str(rounds_map[r_num].get(p, 0)))
+                items.append(QTreeWidgetItem(row_data))
+            det_tree.insertTopLevelItems(0, items)
+
+        def toggle_rounds(checked):
+            det_tree.setVisible(checked)
+            btn_rounds.setText("Ukryj rozdania" if checked else "Pokaż rozdania")
+            if checked:
+                load_rounds()
+                fill_rounds()
+
+        def toggle_chart(checked):
+            chart.setVisible(checked)
+            btn_chart.setText("Ukryj wykres" if checked else "Pokaż wykres")
+            if checked: load_rounds()
+        btn_rounds.toggled.connect(toggle_rounds)
+        btn_chart.toggled.connect(toggle_chart)
+        return det_dlg
 
     def show_full_history(self):
         pass
 
 
+def install_tracing(path=None):
+    # Opakowuje gorące ścieżki w sekcje pomiarowe (przed utworzeniem bazy i okien)
+    TRACER.enable(path)
+    db_methods = [name for name, value in vars(TysiacDB).items()
+                  if callable(value) and not name.startswith("__") and name != "transaction"]
+    TRACER.instrument(TysiacDB, db_methods)
+    TRACER.instrument(DBWorker, ["run_writes"])
+    TRACER.instrument(GameWidget, ["process_round", "update_visuals"])
+    TRACER.instrument(MenuWidget, ["refresh_data", "build_archive_report"])
+    TRACER.instrument(PausedGamesDialog, ["__init__"])
+    TRACER.instrument(HeadToHeadDialog, ["on_loaded"])
+    TRACER.instrument(ScoreChart, ["render_chart"])
+
+
+class StartupProfiler:
+    # --profile-startup: czasy kolejnych faz uruchamiania
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.last = STARTUP_T0
+        self.phases = []
+
+    def mark(self, name):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled: return
+        print("Profil uruchamiania:", file=sys.stderr)
+        for name, seconds in self.phases:
+            print(f"  {name:<32} {seconds * 1000:8.1f} ms", file=sys.stderr)
+        print(f"  {'RAZEM':<32} {(self.last - STARTUP_T0) * 1000:8.1f} ms", file=sys.stderr)
+
+
+def load_app_icon():
+    # Ikona z przeskalowanych kopii w ~/Tysiac_Manager/icons (tworzonych raz, przy zmianie tysiac.png odświeżanych)
+    cache_dir = os.path.join(os.path.expanduser("~/Tysiac_Manager"), "icons")
+    paths = [os.path.join(cache_dir, f"tysiac-{size}.png") for size in ICON_SIZES]
+    try:
+        source_mtime = os.path.getmtime(icon_path)
+    except OSError:
+        return QIcon()
+    if not all(os.path.exists(p) and os.path.getmtime(p) >= source_mtime for p in paths):
+        source = QImage(icon_path)
+        if source.isNull(): return QIcon(icon_path)
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        for size, path in zip(ICON_SIZES, paths):
+            source.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation).save(path)
+    icon = QIcon()
+    for path in paths:
+        icon.addFile(path)
+    return icon
+
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
+        self.profiler = profiler or StartupProfiler(False)
         self.setWindowTitle("Menadżer Gry 1000")
         self.resize(1200, 850)
 
-        self.db = TysiacDB()
+        # Cała komunikacja z bazą przez osobny wątek
+        self.db = DBExecutor(parent=self)
+        self.profiler.mark("start wątku bazy")
+        # Dziennik rozdań bieżącej gry (odzyskiwanie po awarii)
+        self.journal = DealJournal(os.path.join(os.path.expanduser("~/Tysiac_Manager"), "tysiac.journal"))
 
         # Ikona
         if sys.platform == 'win32':
@@ -1047,16 +2927,8 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
 
-        # GŁÓWNA KONFIGURACJA CZCIONKI DLA CAŁEJ APLIKACJI (Styl globalny)
-        self.setStyleSheet("""
-            QWidget { font-size: 12pt; }
-            QTreeWidget { font-size: 14px; }
-            QTreeWidget::item { padding: 5px; }
-            QHeaderView::section { font-size: 14px; font-weight: bold; }
-            QPushButton { font-size: 13px; }
-            QLineEdit { font-size: 14px; }
-            QGroupBox { font-weight: bold; }
-        """)
+        # GŁÓWNA KONFIGURACJA CZCIONKI DLA CAŁEJ APLIKACJI (Styl globalny + stany widgetów)
+        self.setStyleSheet(APP_STYLESHEET)
 
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
@@ -1065,6 +2937,15 @@ class MainWindow(QMainWindow):
         lbl_version = QLabel(f" Wersja: {APP_VERSION} ")
         self.status_bar.addWidget(lbl_version)
 
+        # Nakładka --trace-overlay: rozkład czasu ostatniego rozdania
+        self.lbl_trace = None
+        if TRACE_OVERLAY:
+            self.lbl_trace = QLabel(" Pomiary: brak rozdań ")
+            self.status_bar.addWidget(self.lbl_trace)
+            self.trace_timer = QTimer(self)
+            self.trace_timer.timeout.connect(self.update_trace_overlay)
+            self.trace_timer.start(500)
+
         current_year = datetime.now().year
         year_str = "2025" if current_year == 2025 else f"2025 - {current_year}"
         lbl_copyright = QLabel(f" ©️ KlapkiSzatana {year_str} ")
@@ -1072,41 +2953,154 @@ class MainWindow(QMainWindow):
 
         self.menu_widget = MenuWidget(self, self.db)
         self.stack.addWidget(self.menu_widget)
+        self.stack.setCurrentWidget(self.menu_widget)
+        self.profiler.mark("budowa menu")
+
+        # Ekran gry (i wątek symulacji szans) powstaje dopiero przy pierwszej grze
+        self.game_widget = None
+        self.odds = None
+
+        # Statystyki wczytujemy po pokazaniu okna
+        QTimer.singleShot(0, self.show_menu)
+        QTimer.singleShot(0, self.offer_recovery)
+
+    def closeEvent(self, event):
+        if self.odds is not None: self.odds.shutdown()
+        self.db.shutdown()
+        super().closeEvent(event)
+
+    def update_trace_overlay(self):
+        last = TRACER.last
+        deal = last.get("GameWidget.process_round")
+        if deal is None: return
+        ms = lambda span: (span[1] - span[0]) / 1000
+        parts = [f"GUI {ms(deal):.1f} ms"]
+        visuals = last.get("GameWidget.update_visuals")
+        if visuals and visuals[0] >= deal[0]: parts.append(f"widok {ms(visuals):.1f} ms")
+        saved = last.get("TysiacDB.append_rounds")
+        if saved and saved[0] >= deal[0]:
+            parts.append(f"baza {ms(saved):.1f} ms ({saved[2]} SQL)")
+            parts.append(f"razem {(saved[1] - deal[0]) / 1000:.1f} ms")
+        if self.game_widget is not None and self.game_widget.match is not None:
+            mem = self.game_widget.match.log.memory_report()
+            parts.append(f"dziennik {mem['rows']} wierszy: {mem['compact_bytes'] / 1024:.1f} KB "
+                         f"(słowniki ~{mem['dict_bytes_estimate'] / 1024:.1f} KB)")
+        self.lbl_trace.setText(" Ostatnie rozdanie: " + " | ".join(parts) + " ")
+
+    def offer_recovery(self):
+        # Dziennik został na dysku: awaria lub zamknięcie okna w trakcie gry
+        state = self.journal.recover()
+        if state is None or (state.match_id is None and not len(state.log)):
+            self.journal.clear()
+            return
+        # Brakujące rozdania trafiają do bazy niezależnie od decyzji (jako gra wstrzymana)
+        self.db.submit("recover_journal", state.match_id, state.log, state.dealer_offset, state.started,
+                       callback=lambda result: self.on_journal_recovered(state, *result))
 
-        self.game_widget = GameWidget(self, self.db)
-        self.stack.addWidget(self.game_widget)
-
-        self.show_menu()
+    def on_journal_recovered(self, state, match_id, recovered):
+        self.journal.clear()
+        if match_id is None: return
+        self.menu_widget.refresh_data()
+        text = f"Znaleziono przerwaną grę: {', '.join(state.players)}."
+        if recovered: text += f"\nOdzyskane z dziennika rozdania: {recovered}."
+        if QMessageBox.question(self, "Przerwana gra", text + "\nWznowić ją teraz?",
+                                QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
+            self.db.submit("get_match_snapshot", match_id,
+                           callback=lambda snapshot: snapshot and self.resume_game(match_id, snapshot))
 
     def show_menu(self):
         self.menu_widget.refresh_data()
         self.stack.setCurrentWidget(self.menu_widget)
 
+    def ensure_game_widget(self):
+        if self.game_widget is None:
+            self.odds = OddsWorker(self)
+            self.odds.start()
+            self.game_widget = GameWidget(self, self.db, self.journal, self.odds)
+            self.stack.addWidget(self.game_widget)
+        return self.game_widget
+
     def start_game(self, player_names, dealer_offset=0):
-        self.game_widget.initialize_game(player_names, dealer_offset=dealer_offset)
+        self.ensure_game_widget().initialize_game(player_names, dealer_offset=dealer_offset)
         self.stack.setCurrentWidget(self.game_widget)
 
-    def resume_game(self, player_names, match_id, game_log, dealer_offset=0):
-        self.game_widget.initialize_game(player_names, match_id, game_log, dealer_offset)
+    def resume_game(self, match_id, snapshot):
+        self.ensure_game_widget().initialize_game(snapshot['players'], match_id, snapshot, snapshot['dealer_offset'])
         self.stack.setCurrentWidget(self.game_widget)
 
 
 if __name__ == "__main__":
+    if "--replay" in sys.argv:
+        import tysiac_replay
+        sys.exit(tysiac_replay.main(sys.argv[1:]))
+
+    if "--export" in sys.argv or "--import" in sys.argv:
+        import tysiac_archive
+        sys.exit(tysiac_archive.main(sys.argv[1:], open_db=TysiacDB))
+
+    trace_env = os.environ.get("TYSIAC_TRACE", "")
+    if "--trace" in sys.argv or trace_env or TRACE_OVERLAY:
+        install_tracing(trace_env if trace_env not in ("", "1") else None)
+
+    if "--check-db" in sys.argv:
+        problems = TysiacDB().check_query_plans()
+        for name, detail in problems:
+            print(f"[PEŁNY SKAN] {name}: {detail}")
+        if not problems:
+            print("Wszystkie zapytania korzystają z indeksów.")
+        sys.exit(1 if problems else 0)
+
+    if "--merge" in sys.argv:
+        # Scalanie z bazą z innego komputera: python tysiac.py --merge ŚCIEŻKA/tysiac.db
+        idx = sys.argv.index("--merge")
+        if idx + 1 >= len(sys.argv):
+            print("Użycie: python tysiac.py --merge ŚCIEŻKA_DO_BAZY")
+            sys.exit(2)
+        added, updated, skipped = TysiacDB().merge_from(sys.argv[idx + 1])
+        print(f"Nowe mecze: {added}, zaktualizowane: {updated}, pominięte (tu rozegrane dalej): {skipped}")
+        sys.exit(0)
+
+    if "--rebuild-stats" in sys.argv:
+        db = TysiacDB()
+        changed = db.rebuild_player_stats()
+        db.rebuild_match_summaries()
+        db.rebuild_ratings()
+        db.rebuild_player_daily()
+        db.rebuild_head_to_head()
+        for name in changed:
+            print(f"[POPRAWIONO] {name}")
+        print(f"Statystyki przeliczone. Rozbieżności: {len(changed)}")
+        sys.exit(0)
+
+    profiler = StartupProfiler("--profile-startup" in sys.argv)
+    profiler.mark("importy")
+
     app = QApplication(sys.argv)
+    profiler.mark("QApplication")
 
     # Pobieramy ID ze zmiennej środowiskowej, domyślnie 'tysiac-manager'
     desktop_id = os.environ.get("APP_ID", "tysiac-manager")
     app.setDesktopFileName(desktop_id)
 
     # Ładowanie ikony (musi być plik tysiac.png obok skryptu)
-    app.setWindowIcon(QIcon(icon_path))
+    app.setWindowIcon(load_app_icon())
+    profiler.mark("ikona")
 
     if HAS_THEME:
         qdarktheme.setup_theme("auto")
     else:
         app.setStyle("Fusion")
+    profiler.mark("motyw")
 
-    window = MainWindow()
+    window = MainWindow(profiler)
+    profiler.mark("okno główne (reszta)")
     window.show()
+    profiler.mark("show()")
+
+    if profiler.enabled:
+        def on_first_frame():
+            profiler.mark("pierwsza klatka")
+            window.db.when_idle(lambda: (profiler.mark("statystyki i archiwum"), profiler.report()))
+        QTimer.singleShot(0, on_first_frame)
 
     sys.exit(app.exec())
@@ -0,0 +1,317 @@
+# ==========================================
+# EKSPORT / IMPORT ARCHIWUM (strumieniowo, bez GUI)
+# ==========================================
+# Eksport: python tysiac.py --export PLIK [--format csv|jsonl|bin] [--db ŚCIEŻKA]
+# Import:  python tysiac.py --import PLIK [--format ...]
+# Wiersze czytane paczkami (fetchmany) i zapisywane na bieżąco - w pamięci jest najwyżej
+# jedna paczka / jeden mecz. Import to jedna transakcja z executemany, indeksy budowane
+# na końcu. Mecze dostają nowe lokalne id; mecze o uid już obecnym w bazie są pomijane.
+import os
+import sys
+import csv
+import json
+import time
+import zlib
+import struct
+import sqlite3
+import argparse
+from array import array
+from itertools import groupby
+
+from tysiac_engine import melds_to_mask, mask_to_melds
+from tysiac_replay import DEFAULT_DB_PATH, iter_batches
+
+MATCH_COLUMNS = ("match_id", "date", "winner", "status", "dealer_offset", "duration_seconds", "uid")
+ROUND_COLUMNS = ("round_number", "player_name", "score_change", "meld_40", "meld_60", "meld_80",
+                 "meld_100", "is_declaration", "declared_points")
+FETCH_ROWS = 5000
+BIN_MAGIC = b"TYSARCH1"
+BIN_BLOCK_MATCHES = 1000
+BIN_COUNTS = struct.Struct('<II')      # mecze, rozdania w bloku
+BIN_BLOCK = struct.Struct('<I')        # długość skompresowanego bloku
+FORMATS = ("csv", "jsonl", "bin")
+
+
+def detect_format(path, fmt=None):
+    if fmt: return fmt
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson"): return "jsonl"
+    if ext in ("bin", "tysarch"): return "bin"
+    return "csv"
+
+
+# --- ODCZYT Z BAZY ---
+def iter_rows(conn):
+    # Jedno zapytanie po indeksie (match_id, round_number), pobierane paczkami
+    cursor = conn.execute("""
+        SELECT m.id, m.date, m.winner, m.status, m.initial_dealer_offset, IFNULL(m.duration_seconds, 0), m.uid,
+               r.round_number, r.player_name, r.score_change,
+               r.meld_40, r.meld_60, r.meld_80, r.meld_100, r.is_declaration, r.declared_points
+        FROM matches m
+        LEFT JOIN rounds r ON r.match_id = m.id
+        ORDER BY m.id, r.round_number, r.id
+    """)
+    while True:
+        rows = cursor.fetchmany(FETCH_ROWS)
+        if not rows: return
+        yield from rows
+
+
+def iter_matches(conn):
+    # (mecz, [rozdania]) - rozdania jako krotki w kolejności ROUND_COLUMNS
+    for _, rows in groupby(iter_rows(conn), key=lambda row: row[0]):
+        rows = list(rows)
+        yield rows[0][:7], [row[7:] for row in rows if row[7] is not None]
+
+
+# --- EKSPORT ---
+def export_csv(conn, f):
+    writer = csv.writer(f)
+    writer.writerow(MATCH_COLUMNS + ROUND_COLUMNS)
+    count = 0
+    for row in iter_rows(conn):
+        writer.writerow(["" if v is None else v for v in row])
+        if row[7] is not None: count += 1
+    return count
+
+
+def export_jsonl(conn, f):
+    count = 0
+    for match, rounds in iter_matches(conn):
+        record = dict(zip(MATCH_COLUMNS, match))
+        record["rounds"] = [list(r) for r in rounds]
+        f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        count += len(rounds)
+    return count
+
+
+def _pack_strings(values):
+    # Kolumna tekstów: tablica słów + indeksy (imiona i statusy powtarzają się bardzo często)
+    table = {}
+    indices = array('I', (table.setdefault(v, len(table)) for v in values))
+    words = "\x00".join("" if w is None else "\x01" + w for w in table).encode("utf-8")
+    return struct.pack('<I', len(words)) + words + _pack_array(indices)
+
+
+def _pack_array(values):
+    if sys.byteorder != "little": values.byteswap()
+    data = values.tobytes()
+    return struct.pack('<I', len(data)) + data
+
+
+def export_bin(conn, f):
+    # Blok = BIN_BLOCK_MATCHES meczów, kolumny po kolei, całość skompresowana zlib
+    f.write(BIN_MAGIC)
+    count = 0
+    for batch in iter_batches(iter_matches(conn), BIN_BLOCK_MATCHES):
+        matches = [m for m, _ in batch]
+        rounds = [(i,) + r for i, (_, rs) in enumerate(batch) for r in rs]
+        count += len(rounds)
+        parts = [BIN_COUNTS.pack(len(matches), len(rounds)),
+                 _pack_array(array('q', (m[0] for m in matches))),
+                 _pack_strings([m[1] for m in matches]),
+                 _pack_strings([m[2] for m in matches]),
+                 _pack_strings([m[3] for m in matches]),
+                 _pack_array(array('B', (m[4] or 0 for m in matches))),
+                 _pack_array(array('I', (m[5] or 0 for m in matches))),
+                 _pack_strings([m[6] for m in matches]),
+                 _pack_array(array('I', (r[0] for r in rounds))),
+                 _pack_array(array('H', (r[1] for r in rounds))),
+                 _pack_strings([r[2] for r in rounds]),
+                 _pack_array(array('i', (r[3] for r in rounds))),
+                 _pack_array(array('B', (melds_to_mask({'40': r[4], '60': r[5], '80': r[6], '100': r[7]})
+                                         for r in rounds))),
+                 _pack_array(array('B', (r[8] or 0 for r in rounds))),
+                 _pack_array(array('H', (r[9] or 0 for r in rounds)))]
+        block = zlib.compress(b"".join(parts), 6)
+        f.write(BIN_BLOCK.pack(len(block)) + block)
+    return count
+
+
+def export_archive(db_path, out_path, fmt=None):
+    fmt = detect_format(out_path, fmt)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        if fmt == "bin":
+            with open(out_path, "wb") as f: return export_bin(conn, f)
+        with open(out_path, "w", encoding="utf-8", newline="") as f:
+            return export_csv(conn, f) if fmt == "csv" else export_jsonl(conn, f)
+    finally:
+        conn.close()
+
+
+# --- ODCZYT PLIKÓW ---
+def read_csv(f):
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None: return
+    if tuple(header) != MATCH_COLUMNS + ROUND_COLUMNS:
+        raise ValueError("Nieznany układ kolumn CSV")
+    as_int = lambda v: int(v) if v != "" else 0
+    for _, rows in groupby(reader, key=lambda row: row[0]):
+        rows = list(rows)
+        m = rows[0]
+        match = (int(m[0]), m[1], m[2] or None, m[3], as_int(m[4]), as_int(m[5]), m[6] or None)
+        rounds = [(int(r[7]), r[8], int(r[9]), as_int(r[10]), as_int(r[11]), as_int(r[12]),
+                   as_int(r[13]), as_int(r[14]), as_int(r[15])) for r in rows if r[7] != ""]
+        yield match, rounds
+
+
+def read_jsonl(f):
+    for line in f:
+        if not line.strip(): continue
+        rec = json.loads(line)
+        match = tuple(rec.get(c) for c in MATCH_COLUMNS)
+        yield match, [tuple(r) for r in rec["rounds"]]
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size: raise ValueError("Urwany plik archiwum")
+    return data
+
+
+def _unpack_array(buf, pos, typecode):
+    (size,) = struct.unpack_from('<I', buf, pos)
+    values = array(typecode)
+    values.frombytes(buf[pos + 4:pos + 4 + size])
+    if sys.byteorder != "little": values.byteswap()
+    return values, pos + 4 + size
+
+
+def _unpack_strings(buf, pos):
+    (size,) = struct.unpack_from('<I', buf, pos)
+    words = [None if w == "" else w[1:] for w in bytes(buf[pos + 4:pos + 4 + size]).decode("utf-8").split("\x00")]
+    indices, pos = _unpack_array(buf, pos + 4 + size, 'I')
+    return [words[i] for i in indices], pos
+
+
+def read_bin(f):
+    if _read_exact(f, len(BIN_MAGIC)) != BIN_MAGIC:
+        raise ValueError("To nie jest plik archiwum Tysiąca")
+    while True:
+        header = f.read(BIN_BLOCK.size)
+        if not header: return
+        buf = memoryview(zlib.decompress(_read_exact(f, BIN_BLOCK.unpack(header)[0])))
+        pos = BIN_COUNTS.size
+        ids, pos = _unpack_array(buf, pos, 'q')
+        dates, pos = _unpack_strings(buf, pos)
+        winners, pos = _unpack_strings(buf, pos)
+        statuses, pos = _unpack_strings(buf, pos)
+        offsets, pos = _unpack_array(buf, pos, 'B')
+        durations, pos = _unpack_array(buf, pos, 'I')
+        uids, pos = _unpack_strings(buf, pos)
+        owners, pos = _unpack_array(buf, pos, 'I')
+        numbers, pos = _unpack_array(buf, pos, 'H')
+        players, pos = _unpack_strings(buf, pos)
+        scores, pos = _unpack_array(buf, pos, 'i')
+        masks, pos = _unpack_array(buf, pos, 'B')
+        decls, pos = _unpack_array(buf, pos, 'B')
+        declared, pos = _unpack_array(buf, pos, 'H')
+
+        per_match = [[] for _ in ids]
+        for i, owner in enumerate(owners):
+            m = mask_to_melds(masks[i])
+            per_match[owner].append((numbers[i], players[i], scores[i], m['40'], m['60'], m['80'], m['100'],
+                                     decls[i], declared[i]))
+        for i, match_id in enumerate(ids):
+            yield (match_id, dates[i], winners[i], statuses[i], offsets[i], durations[i], uids[i]), per_match[i]
+
+
+def iter_file(path, fmt=None):
+    fmt = detect_format(path, fmt)
+    if fmt == "bin":
+        with open(path, "rb") as f: yield from read_bin(f)
+        return
+    with open(path, encoding="utf-8", newline="") as f:
+        yield from (read_csv(f) if fmt == "csv" else read_jsonl(f))
+
+
+# --- IMPORT ---
+def import_archive(db, path, fmt=None, chunk_rounds=FETCH_ROWS * 4):
+    # db: TysiacDB. Zwraca (liczba meczów, liczba rozdań, pominięte mecze).
+    matches_count = rounds_count = skipped = 0
+    with db.transaction() as cursor:
+        # sqlite3 otwiera transakcję dopiero przy pierwszym INSERT - DROP INDEX wykonany wcześniej
+        # zostałby zatwierdzony od razu i nie wróciłby po wycofaniu nieudanego importu
+        if not db.conn.in_transaction:
+            cursor.execute("BEGIN")
+        # Indeksy budujemy raz na końcu zamiast aktualizować przy każdym wierszu
+        # (poza unikalnym indeksem uid - po nim rozpoznajemy mecze już obecne w bazie)
+        indexes = cursor.execute("""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND tbl_name IN ('matches', 'rounds') AND sql IS NOT NULL
+              AND sql NOT LIKE 'CREATE UNIQUE%'
+        """).fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+
+        next_id = cursor.execute("SELECT IFNULL(MAX(id), 0) FROM matches").fetchone()[0] + 1
+        match_rows, round_rows = [], []
+        seen = set()
+
+        def flush():
+            cursor.executemany("""
+                INSERT INTO matches (id, date, winner, status, initial_dealer_offset, duration_seconds, uid)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, match_rows)
+            cursor.executemany("""
+                INSERT INTO rounds (match_id, round_number, player_name, score_change,
+                                    meld_40, meld_60, meld_80, meld_100,
+                                    is_declaration, declared_points)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, round_rows)
+            match_rows.clear()
+            round_rows.clear()
+
+        for match, rounds in iter_file(path, fmt):
+            uid = match[6] or db.new_match_uid(match[1])
+            if uid in seen or cursor.execute("SELECT 1 FROM matches WHERE uid = ?", (uid,)).fetchone():
+                skipped += 1
+                continue
+            seen.add(uid)
+            match_id = next_id
+            next_id += 1
+            match_rows.append((match_id,) + tuple(match[1:6]) + (uid,))
+            round_rows.extend((match_id,) + tuple(r) for r in rounds)
+            matches_count += 1
+            rounds_count += len(rounds)
+            if len(round_rows) >= chunk_rounds: flush()
+        flush()
+
+        for _, sql in indexes:
+            cursor.execute(sql)
+        # Statystyki, podsumowania meczów, rankingi i pojedynki - przeliczenie raz, w tej samej transakcji
+        db.rebuild_player_stats()
+        db.rebuild_match_summaries()
+        db.rebuild_ratings()
+        db.rebuild_player_daily()
+        db.rebuild_head_to_head()
+    return matches_count, rounds_count, skipped
+
+
+def main(argv=None, open_db=None):
+    parser = argparse.ArgumentParser(description="Eksport / import archiwum Tysiąca")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--export", metavar="PLIK", help="zapisz archiwum do pliku")
+    group.add_argument("--import", dest="import_path", metavar="PLIK", help="dołącz mecze z pliku")
+    parser.add_argument("--format", choices=FORMATS, help="format pliku (domyślnie wg rozszerzenia)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="ścieżka do tysiac.db")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.export:
+        rows = export_archive(args.db, args.export, args.format)
+        print(f"Wyeksportowano rozdań: {rows} -> {args.export} ({time.perf_counter() - start:.2f} s)")
+        return 0
+
+    if open_db is None:
+        from tysiac import TysiacDB as open_db
+    matches, rows, skipped = import_archive(open_db(os.path.abspath(args.db)), args.import_path, args.format)
+    print(f"Zaimportowano meczów: {matches}, rozdań: {rows}, pominięto (już w bazie): {skipped} "
+          f"({time.perf_counter() - start:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
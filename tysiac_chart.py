@@ -0,0 +1,40 @@
+# ==========================================
+# WYKRESY PRZEBIEGU PUNKTÓW (bez Qt)
+# ==========================================
+# Sumy narastające (mecz: po każdym rozdaniu, kariera: po każdym meczu) i zmniejszanie
+# liczby punktów metodą LTTB (Largest-Triangle-Three-Buckets, Steinarsson 2013):
+# z każdego kubełka zostaje punkt tworzący największy trójkąt z sąsiadami - szczyty i dołki
+# przetrwają, a wykres tysięcy meczów ma tyle punktów, ile pikseli szerokości.
+from itertools import accumulate
+
+
+def running_totals(changes, start=0):
+    # Pierwszy punkt to stan przed pierwszym rozdaniem (meczem)
+    return list(accumulate(changes, initial=start))
+
+
+def lttb(values, threshold):
+    # values: wartości w równych odstępach (x = indeks). Zwraca listę (x, y), pierwszy i ostatni punkt zawsze.
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(enumerate(values))
+    sampled = [(0, values[0])]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # Średnia następnego kubełka (dla ostatniego - ostatni punkt)
+        avg_x = (end + next_end - 1) / 2
+        avg_y = sum(values[end:next_end]) / (next_end - end)
+        ay = values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (values[j] - ay) - (a - j) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append((best, values[best]))
+        a = best
+    sampled.append((n - 1, values[-1]))
+    return sampled
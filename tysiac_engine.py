@@ -0,0 +1,234 @@
+# ==========================================
+# SILNIK PUNKTACJI (czysty Python, bez Qt)
+# ==========================================
+# Zasady liczenia punktów Tysiąca: zaokrąglanie, meldunki, gra pod deklarację,
+# rozdający, "pod kreską" i wygrana. GameWidget jest tylko widokiem na Match,
+# a ten sam kod może przeliczać archiwalne mecze wsadowo (bez PySide6).
+import sys
+import struct
+from array import array
+
+MELD_SUITS = ('40', '60', '80', '100')
+MELD_VALUES = {'40': 40, '60': 60, '80': 80, '100': 100}
+NO_MELDS = {'40': 0, '60': 0, '80': 0, '100': 0}
+MELD_BITS = {'40': 1, '60': 2, '80': 4, '100': 8}
+
+UNDER_LINE_SCORE = 800   # "Pod kreską"
+WIN_SCORE = 1000
+
+
+def round_points(points):
+    if points < 0: return points
+    return ((points + 5) // 10) * 10
+
+
+def meld_points(melds):
+    return sum(MELD_VALUES[suit] for suit in MELD_SUITS if melds.get(suit))
+
+
+def score_change(cards, melds, is_declaration, declared_points):
+    # Gra pod deklarację: ugrane (karty + meldunki bez zaokrąglania) >= deklaracja -> +deklaracja, inaczej -deklaracja
+    melds_total = meld_points(melds)
+    if is_declaration:
+        if cards + melds_total >= declared_points:
+            return declared_points
+        return -declared_points
+    return round_points(cards) + melds_total
+
+
+def meld_holders(melds_per_player):
+    # Meldunek danego koloru może mieć tylko jeden gracz w rozdaniu (wygrywa ostatni zaznaczony)
+    holders = dict.fromkeys(MELD_SUITS)
+    for idx, melds in enumerate(melds_per_player):
+        for suit in MELD_SUITS:
+            if melds.get(suit): holders[suit] = idx
+    return holders
+
+
+def melds_to_mask(melds):
+    mask = 0
+    for suit in MELD_SUITS:
+        if melds.get(suit): mask |= MELD_BITS[suit]
+    return mask
+
+
+def mask_to_melds(mask):
+    return {suit: 1 if mask & MELD_BITS[suit] else 0 for suit in MELD_SUITS}
+
+
+def validate_deal(entries, player_count):
+    errors = []
+    if len(entries) != player_count:
+        errors.append(f"Oczekiwano {player_count} graczy, podano {len(entries)}")
+    for suit in MELD_SUITS:
+        if sum(1 for e in entries if e.melds.get(suit)) > 1:
+            errors.append(f"Meldunek {suit} zgłoszony przez więcej niż jednego gracza")
+    if sum(1 for e in entries if e.is_declaration) > 1:
+        errors.append("Pod deklarację może grać tylko jeden gracz")
+    for e in entries:
+        if e.is_declaration and e.declared_points < 0:
+            errors.append(f"{e.player}: deklaracja nie może być ujemna")
+    return errors
+
+
+class DealEntry:
+    __slots__ = ('player', 'cards', 'melds', 'is_declaration', 'declared_points', 'score')
+
+    def __init__(self, player, cards=0, melds=None, is_declaration=False, declared_points=0, score=None):
+        self.player = player
+        self.cards = cards
+        self.melds = melds if melds is not None else dict(NO_MELDS)
+        self.is_declaration = bool(is_declaration)
+        self.declared_points = declared_points
+        self.score = score
+
+
+
+class Deal:
+    __slots__ = ('round_number', 'entries')
+
+    def __init__(self, round_number, entries):
+        self.round_number = round_number
+        self.entries = entries
+
+    def scores(self):
+        return [e.score for e in self.entries]
+
+
+class GameLog:
+    # Zwarty zapis rozdań: wiersze struct w jednym bytearray, meldunki jako maska bitowa.
+    # Wiersz: runda, miejsce gracza, zmiana punktów, meldunki, deklaracja, zadeklarowano (11 B).
+    ROW = struct.Struct('<HBiBBH')
+    __slots__ = ('players', 'data')
+
+    def __init__(self, players, data=b''):
+        self.players = tuple(players)
+        self.data = bytearray(data)
+
+    def __len__(self):
+        return len(self.data) // self.ROW.size
+
+    def append(self, round_number, seat, score, melds_mask=0, is_declaration=False, declared_points=0):
+        self.data += self.ROW.pack(round_number, seat, score, melds_mask, 1 if is_declaration else 0, declared_points)
+
+    def _view(self, start):
+        # start jak indeks listy (ujemny liczony od końca)
+        rows = len(self)
+        if start < 0: start = max(rows + start, 0)
+        return memoryview(self.data)[min(start, rows) * self.ROW.size:]
+
+    def records(self, start=0):
+        # (runda, miejsce, zmiana, maska_meldunków, deklaracja, zadeklarowano)
+        return self.ROW.iter_unpack(self._view(start))
+
+    def rows(self, start=0):
+        # Widok dla bazy: kolumny jak w tabeli rounds
+        players = self.players
+        for rnd, seat, score, mask, decl, declared in self.records(start):
+            yield (rnd, players[seat], score, mask & 1, mask >> 1 & 1, mask >> 2 & 1, mask >> 3 & 1, decl, declared)
+
+    def entries(self, start=0):
+        # Widok słownikowy (stary format) - tylko gdy naprawdę potrzebny
+        for rnd, seat, score, mask, decl, declared in self.records(start):
+            yield {'round': rnd, 'player': self.players[seat], 'score': score,
+                   'melds': mask_to_melds(mask), 'is_declaration': decl, 'declared_points': declared}
+
+    def snapshot(self, start=0):
+        # Niezmienna kopia (np. ostatnie rozdanie wysyłane do wątku bazy): jedno kopiowanie bajtów
+        return GameLog(self.players, bytes(self._view(start)))
+
+    def memory_report(self):
+        # Rozmiar zwartego zapisu vs. lista słowników (stary format, szacunek z jednego wiersza)
+        compact = sys.getsizeof(self.data) + sys.getsizeof(self.players)
+        legacy = sys.getsizeof([None] * len(self))
+        if len(self):
+            sample = next(self.entries())
+            per_row = sys.getsizeof(sample) + sys.getsizeof(sample['melds'])
+            legacy += per_row * len(self)
+        return {'rows': len(self), 'row_bytes': self.ROW.size, 'compact_bytes': compact,
+                'dict_bytes_estimate': legacy}
+
+
+class ScoreSheet:
+    # Kolumnowa historia punktów: jedna array('i') na gracza, indeks = numer rozdania - 1
+    __slots__ = ('columns',)
+
+    def __init__(self, player_count, rounds=0):
+        self.columns = [array('i', [0]) * rounds for _ in range(player_count)]
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def append(self, scores):
+        for column, score in zip(self.columns, scores):
+            column.append(score)
+
+    def set(self, round_index, player_index, score):
+        missing = round_index + 1 - len(self)
+        if missing > 0:
+            for column in self.columns: column.extend(array('i', [0]) * missing)
+        self.columns[player_index][round_index] = score
+
+    def row(self, round_index):
+        return [column[round_index] for column in self.columns]
+
+    def totals(self):
+        return [sum(column) for column in self.columns]
+
+
+class Match:
+    __slots__ = ('players', 'dealer_offset', 'round_number', 'scores', 'log', 'winner', 'sheet')
+
+    def __init__(self, players, dealer_offset=0):
+        self.players = list(players)
+        self.dealer_offset = dealer_offset
+        self.round_number = 1
+        self.scores = [0] * len(self.players)
+        self.log = GameLog(self.players)
+        self.winner = None
+        self.sheet = ScoreSheet(len(self.players))
+
+    @classmethod
+    def from_snapshot(cls, players, totals, sheet, dealer_offset=0):
+        # Wznowienie z zapisanych sum i kolumnowej historii - log obejmuje tylko nowe rozdania
+        match = cls(players, dealer_offset)
+        match.scores = list(totals)
+        match.sheet = sheet
+        match.round_number = len(sheet) + 1
+        return match
+
+    def dealer_index(self):
+        return (self.round_number - 1 + self.dealer_offset) % len(self.players)
+
+    def is_under_line(self, idx):
+        return self.scores[idx] >= UNDER_LINE_SCORE
+
+    def has_any_points(self):
+        return any(self.scores)
+
+    def leader(self):
+        return max(zip(self.players, self.scores), key=lambda ps: ps[1])[0]
+
+    def play(self, entries):
+        # entries: DealEntry dla każdego gracza, w kolejności self.players
+        errors = validate_deal(entries, len(self.players))
+        if errors: raise ValueError("; ".join(errors))
+
+        winner_found = None
+        for idx, entry in enumerate(entries):
+            entry.player = self.players[idx]
+            entry.score = score_change(entry.cards, entry.melds, entry.is_declaration, entry.declared_points)
+            self.scores[idx] += entry.score
+            # Jak w oryginalnych zasadach aplikacji: wygrywa ostatni (w kolejności) gracz z >= 1000
+            if self.scores[idx] >= WIN_SCORE: winner_found = self.players[idx]
+
+        for idx, entry in enumerate(entries):
+            self.log.append(self.round_number, idx, entry.score, melds_to_mask(entry.melds),
+                            entry.is_declaration, entry.declared_points)
+        deal = Deal(self.round_number, entries)
+        self.sheet.append(deal.scores())
+        if winner_found:
+            self.winner = winner_found
+        else:
+            self.round_number += 1
+        return deal
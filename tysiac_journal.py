@@ -0,0 +1,130 @@
+# ==========================================
+# DZIENNIK ROZDAŃ (autozapis odporny na awarię, bez Qt)
+# ==========================================
+# Każde zatwierdzone rozdanie trafia najpierw do małego pliku obok bazy (tysiac.journal)
+# jednym write() z wątku GUI - zanim wątek bazy zdąży je dopisać do tabeli rounds.
+# Po awarii programu dziennik pozwala dopisać brakujące rozdania i od razu wznowić grę.
+# Format rekordu: typ (1 B), długość (4 B), dane, crc32 (4 B) - urwany koniec pliku jest pomijany.
+import os
+import struct
+import zlib
+from datetime import datetime
+
+from tysiac_engine import GameLog
+
+REC_HEADER = struct.Struct('<cI')
+REC_CRC = struct.Struct('<I')
+START = struct.Struct('<qB19s')    # id meczu (-1 = jeszcze nieznane), rozdający, data rozpoczęcia
+COMMIT = struct.Struct('<qH')      # id meczu, ostatnia runda zapisana w bazie
+NAME_SEP = "\x1f"
+# Po przekroczeniu tego rozmiaru dziennik jest przepisywany (zostają tylko niezapisane rozdania)
+COMPACT_BYTES = 16 * 1024
+
+
+class JournalState:
+    __slots__ = ('players', 'dealer_offset', 'match_id', 'started', 'log', 'committed')
+
+    def __init__(self, players, dealer_offset, match_id, started):
+        self.players = players
+        self.dealer_offset = dealer_offset
+        self.match_id = match_id
+        self.started = started
+        self.log = GameLog(players)
+        self.committed = 0
+
+
+class DealJournal:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.state = None
+        self.pending = {}  # runda -> spakowane wiersze GameLog, jeszcze nie w bazie
+
+    # --- zapis ---
+    def _write(self, kind, payload):
+        body = kind + payload
+        self.file.write(REC_HEADER.pack(kind, len(payload)) + payload + REC_CRC.pack(zlib.crc32(body)))
+
+    def _start_payload(self):
+        s = self.state
+        return START.pack(-1 if s.match_id is None else s.match_id, s.dealer_offset, s.started.encode()) + \
+            NAME_SEP.join(s.players).encode("utf-8")
+
+    def start(self, players, dealer_offset=0, match_id=None):
+        self.close()
+        self.state = JournalState(list(players), dealer_offset, match_id,
+                                  datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.pending = {}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Bez buforowania: każdy rekord to jeden write() - przeżywa awarię procesu (nie zanik zasilania)
+        self.file = open(self.path, "wb", buffering=0)
+        self._write(b'S', self._start_payload())
+
+    def append_deal(self, round_number, rows):
+        if self.file is None: return
+        self.pending[round_number] = bytes(rows)
+        self._write(b'D', self.pending[round_number])
+
+    def mark_committed(self, match_id, round_number):
+        # Wywoływane po zatwierdzeniu rozdania przez wątek bazy
+        if self.file is None: return
+        self.state.match_id = match_id
+        for rnd in [r for r in self.pending if r <= round_number]:
+            del self.pending[rnd]
+        self._write(b'C', COMMIT.pack(match_id, round_number))
+        if self.file.tell() > COMPACT_BYTES:
+            self.compact()
+
+    def compact(self):
+        # Nowy plik z nagłówkiem i niezapisanymi rozdaniami, podmieniany atomowo
+        tmp_path = self.path + ".tmp"
+        self.file.close()
+        self.file = open(tmp_path, "wb", buffering=0)
+        self._write(b'S', self._start_payload())
+        for rnd in sorted(self.pending):
+            self._write(b'D', self.pending[rnd])
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def clear(self):
+        # Gra wstrzymana / zakończona / porzucona - nic do odzyskania
+        self.close()
+        self.state = None
+        self.pending = {}
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # --- odczyt po awarii ---
+    def recover(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        state = None
+        pos = 0
+        while pos + REC_HEADER.size <= len(data):
+            kind, length = REC_HEADER.unpack_from(data, pos)
+            end = pos + REC_HEADER.size + length
+            if end + REC_CRC.size > len(data): break
+            payload = data[pos + REC_HEADER.size:end]
+            if REC_CRC.unpack_from(data, end)[0] != zlib.crc32(kind + payload): break
+            pos = end + REC_CRC.size
+
+            if kind == b'S':
+                match_id, dealer_offset, started = START.unpack_from(payload)
+                names = payload[START.size:].decode("utf-8").split(NAME_SEP)
+                state = JournalState(names, dealer_offset, None if match_id < 0 else match_id, started.decode())
+            elif state is None:
+                break
+            elif kind == b'D':
+                state.log.data += payload
+            elif kind == b'C':
+                state.match_id, state.committed = COMMIT.unpack(payload)
+        return state
@@ -0,0 +1,85 @@
+# ==========================================
+# SZANSE NA WYGRANĄ (Monte Carlo, bez Qt)
+# ==========================================
+# Symulacja dokończenia meczu: w każdym rozdaniu gracz dostaje zmianę punktów wylosowaną
+# z jego własnych rozdań z archiwum. Z NumPy liczone są tysiące przebiegów naraz (paczkami),
+# bez NumPy działa wolniejsza wersja w czystym Pythonie z mniejszą liczbą przebiegów.
+# cancel() sprawdzane między rozdaniami - nowe rozdanie przerywa poprzednią symulację.
+import random
+
+from tysiac_engine import WIN_SCORE
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+SIMULATIONS = 20000
+SIMULATIONS_PURE = 2000
+BATCH = 5000
+# Zabezpieczenie przed nieskończoną grą: bez rozstrzygnięcia wygrywa prowadzący
+MAX_DEALS = 300
+# Gracz z mniejszą liczbą rozdań w archiwum dostaje dodatkowo wspólny rozkład wszystkich graczy
+MIN_SAMPLES = 30
+
+
+def build_distributions(samples, pooled):
+    # samples: gracz -> lista zmian punktów z archiwum. Zwraca None, gdy nie ma z czego liczyć.
+    dists = {}
+    for name, values in samples.items():
+        values = list(values)
+        if len(values) < MIN_SAMPLES: values += pooled
+        if not values: return None
+        dists[name] = values
+    return dists
+
+
+def estimate_win_odds(scores, dists, simulations=None, cancel=None, seed=None):
+    # scores: bieżące sumy, dists: rozkład każdego gracza (ta sama kolejność).
+    # Zwraca listę prawdopodobieństw albo None po przerwaniu.
+    if HAS_NUMPY:
+        return _estimate_numpy(scores, dists, simulations or SIMULATIONS, cancel, np.random.default_rng(seed))
+    return _estimate_pure(scores, dists, simulations or SIMULATIONS_PURE, cancel, random.Random(seed))
+
+
+def _estimate_numpy(scores, dists, simulations, cancel, rng):
+    n = len(scores)
+    tables = [np.asarray(d, dtype=np.int32) for d in dists]
+    wins = np.zeros(n, dtype=np.int64)
+    for start in range(0, simulations, BATCH):
+        size = min(BATCH, simulations - start)
+        totals = np.tile(np.asarray(scores, dtype=np.int32), (size, 1))
+        alive = np.arange(size)
+        for _ in range(MAX_DEALS):
+            if cancel and cancel(): return None
+            totals[alive] += np.column_stack([t[rng.integers(0, len(t), alive.size)] for t in tables])
+            reached = totals[alive] >= WIN_SCORE
+            done = reached.any(axis=1)
+            if done.any():
+                # Jak Match.play: wygrywa ostatni w kolejności gracz z >= 1000
+                last = n - 1 - np.argmax(reached[done][:, ::-1], axis=1)
+                wins += np.bincount(last, minlength=n)
+                alive = alive[~done]
+                if alive.size == 0: break
+        if alive.size:
+            wins += np.bincount(np.argmax(totals[alive], axis=1), minlength=n)
+    return (wins / simulations).tolist()
+
+
+def _estimate_pure(scores, dists, simulations, cancel, rng):
+    n = len(scores)
+    wins = [0] * n
+    for sim in range(simulations):
+        if cancel and sim % 50 == 0 and cancel(): return None
+        totals = list(scores)
+        winner = None
+        for _ in range(MAX_DEALS):
+            for i in range(n):
+                totals[i] += rng.choice(dists[i])
+                if totals[i] >= WIN_SCORE: winner = i
+            if winner is not None: break
+        if winner is None:
+            winner = max(range(n), key=totals.__getitem__)
+        wins[winner] += 1
+    return [w / simulations for w in wins]
@@ -0,0 +1,53 @@
+# ==========================================
+# RANKING ELO DLA GIER 2-4 OSOBOWYCH (bez Qt)
+# ==========================================
+# Mecz wieloosobowy liczony jako komplet pojedynków: każdy gracz "gra" z każdym rywalem,
+# wynik pojedynku wynika z kolejności na koniec meczu (zwycięzca zawsze pierwszy).
+# Zmiana rankingu = K / (liczba rywali) * suma (wynik - oczekiwany wynik).
+RATING_START = 1500.0
+RATING_SCALE = 400.0
+# Nowi gracze (pierwsze mecze) zmieniają ranking szybciej - szybciej trafiają na swoje miejsce
+RATING_K = 24.0
+RATING_K_PROVISIONAL = 48.0
+PROVISIONAL_GAMES = 10
+
+
+def expected_score(rating, opponent):
+    return 1.0 / (1.0 + 10 ** ((opponent - rating) / RATING_SCALE))
+
+
+def k_factor(games):
+    return RATING_K_PROVISIONAL if games < PROVISIONAL_GAMES else RATING_K
+
+
+def match_deltas(ratings, games, places):
+    # ratings, games: stan przed meczem; places: miejsce gracza (0 = pierwsze, remis = to samo miejsce)
+    n = len(ratings)
+    if n < 2: return [0.0] * n
+    deltas = []
+    for i in range(n):
+        total = 0.0
+        for j in range(n):
+            if i == j: continue
+            actual = 1.0 if places[i] < places[j] else 0.5 if places[i] == places[j] else 0.0
+            total += actual - expected_score(ratings[i], ratings[j])
+        deltas.append(k_factor(games[i]) * total / (n - 1))
+    return deltas
+
+
+def standings(totals, winner=None):
+    # Miejsca z sum punktów; zwycięzca z bazy (także przy ręcznym zakończeniu) zawsze na pierwszym
+    keys = [(name == winner, points) for name, points in totals]
+    return [sum(1 for other in keys if other > key) for key in keys]
+
+
+def apply_match(state, totals, winner=None):
+    # state: gracz -> [ranking, liczba meczów], modyfikowany w miejscu. Zwraca zmiany rankingu.
+    for name, _ in totals:
+        state.setdefault(name, [RATING_START, 0])
+    names = [name for name, _ in totals]
+    deltas = match_deltas([state[n][0] for n in names], [state[n][1] for n in names], standings(totals, winner))
+    for name, delta in zip(names, deltas):
+        state[name][0] += delta
+        state[name][1] += 1
+    return dict(zip(names, deltas))
@@ -0,0 +1,168 @@
+# ==========================================
+# PRZELICZANIE I WALIDACJA ARCHIWUM (bez GUI)
+# ==========================================
+# Uruchomienie: python tysiac.py --replay [--workers N] [--db ŚCIEŻKA]
+#           lub: python tysiac_replay.py [--workers N] [--db ŚCIEŻKA]
+# Mecze są czytane strumieniowo (jeden mecz w pamięci na raz) i sprawdzane
+# tymi samymi zasadami co GameWidget.process_round (tysiac_engine).
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from tysiac_engine import MELD_SUITS, WIN_SCORE, meld_points
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~/Tysiac_Manager"), "tysiac.db")
+
+
+def iter_matches(conn):
+    # Jedno zapytanie po indeksie (match_id, round_number) - grupujemy w locie po meczu
+    cursor = conn.execute("""
+        SELECT m.id, m.status, m.winner, m.initial_dealer_offset,
+               r.round_number, r.player_name, r.score_change,
+               r.meld_40, r.meld_60, r.meld_80, r.meld_100,
+               r.is_declaration, r.declared_points
+        FROM matches m
+        LEFT JOIN rounds r ON r.match_id = m.id
+        ORDER BY m.id, r.round_number, r.id
+    """)
+    for match_id, rows in groupby(cursor, key=lambda row: row[0]):
+        rows = list(rows)
+        match = rows[0][:4]
+        rounds = [row[4:] for row in rows if row[4] is not None]
+        yield match, rounds
+
+
+def iter_batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch: yield batch
+
+
+def check_match(match, rounds):
+    # match: (id, status, winner, dealer_offset)
+    # rounds: (runda, gracz, zmiana, m40, m60, m80, m100, deklaracja, zadeklarowano) w kolejności zapisu
+    match_id, status, winner, _ = match
+    issues = []
+    if not rounds:
+        if status == 'finished': issues.append("Zakończony mecz bez rozdań")
+        return issues
+
+    totals = {}
+    players = None
+    rule_winner = None
+    expected_round = 1
+    for round_number, deal in groupby(rounds, key=lambda row: row[0]):
+        deal = list(deal)
+        names = [row[1] for row in deal]
+        if round_number != expected_round:
+            issues.append(f"Runda {round_number}: oczekiwano numeru {expected_round}")
+        expected_round = round_number + 1
+        if players is None:
+            players = set(names)
+        elif set(names) != players or len(names) != len(players):
+            issues.append(f"Runda {round_number}: inny skład graczy ({', '.join(names)})")
+        if rule_winner is not None:
+            issues.append(f"Runda {round_number}: rozdanie po wygranej gracza {rule_winner}")
+
+        for idx, suit in enumerate(MELD_SUITS):
+            holders = [row[1] for row in deal if row[3 + idx]]
+            if len(holders) > 1:
+                issues.append(f"Runda {round_number}: meldunek {suit} u kilku graczy ({', '.join(holders)})")
+        declarers = [row[1] for row in deal if row[7]]
+        if len(declarers) > 1:
+            issues.append(f"Runda {round_number}: kilku graczy pod deklarację ({', '.join(declarers)})")
+
+        deal_winner = None
+        for row in deal:
+            _, name, score, m40, m60, m80, m100, is_decl, declared = row
+            if is_decl:
+                if abs(score) != declared:
+                    issues.append(f"Runda {round_number}, {name}: zmiana {score} nie zgadza się z deklaracją {declared}")
+            else:
+                cards = score - meld_points({'40': m40, '60': m60, '80': m80, '100': m100})
+                if cards >= 0 and cards % 10 != 0:
+                    issues.append(f"Runda {round_number}, {name}: punkty z kart ({cards}) nie są zaokrąglone")
+            totals[name] = totals.get(name, 0) + score
+            if totals[name] >= WIN_SCORE: deal_winner = name
+        if rule_winner is None and deal_winner is not None:
+            rule_winner = deal_winner
+
+    if status == 'finished':
+        # Bez przekroczenia 1000 gra była zakończona ręcznie - wygrywa lider
+        expected = rule_winner or max(totals, key=totals.get)
+        if winner != expected:
+            issues.append(f"Zwycięzca w bazie: {winner}, po przeliczeniu: {expected}")
+    elif rule_winner is not None:
+        issues.append(f"Mecz wstrzymany, choć {rule_winner} osiągnął {WIN_SCORE}")
+    return issues
+
+
+def check_batch(batch):
+    results = []
+    rounds_count = 0
+    for match, rounds in batch:
+        rounds_count += len(rounds)
+        issues = check_match(match, rounds)
+        if issues: results.append((match[0], issues))
+    return len(batch), rounds_count, results
+
+
+def run_replay(db_path, workers=1, batch_size=200, out=sys.stdout):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    batches = iter_batches(iter_matches(conn), batch_size)
+    matches_count = rounds_count = issues_count = 0
+    start = time.perf_counter()
+
+    def report(result):
+        nonlocal matches_count, rounds_count, issues_count
+        n_matches, n_rounds, problems = result
+        matches_count += n_matches
+        rounds_count += n_rounds
+        for match_id, issues in problems:
+            issues_count += len(issues)
+            for issue in issues:
+                print(f"[Mecz {match_id}] {issue}", file=out)
+
+    if workers <= 1:
+        for batch in batches:
+            report(check_batch(batch))
+    else:
+        # Ograniczona liczba paczek w locie - pamięć nie rośnie z rozmiarem archiwum
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for batch in batches:
+                pending.add(pool.submit(check_batch, batch))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done: report(future.result())
+            for future in pending: report(future.result())
+    conn.close()
+
+    elapsed = time.perf_counter() - start
+    rate = matches_count / elapsed if elapsed > 0 else 0.0
+    print(f"Sprawdzono meczów: {matches_count}, rozdań: {rounds_count}, problemów: {issues_count}", file=out)
+    print(f"Czas: {elapsed:.2f} s ({rate:.0f} meczów/s)", file=out)
+    return issues_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Przeliczenie i walidacja archiwum Tysiąca")
+    parser.add_argument("--replay", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="ścieżka do tysiac.db")
+    parser.add_argument("--workers", type=int, default=1, help="liczba procesów (domyślnie 1)")
+    parser.add_argument("--batch-size", type=int, default=200, help="meczów na paczkę")
+    args = parser.parse_args(argv)
+    issues = run_replay(args.db, args.workers, args.batch_size)
+    return 1 if issues else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# ==========================================
+# POMIARY CZASU (opcjonalne, bez Qt)
+# ==========================================
+# Włączanie: python tysiac.py --trace  lub  TYSIAC_TRACE=1 (albo TYSIAC_TRACE=ścieżka.json)
+# Wynik: plik w formacie Chrome trace-event (chrome://tracing, https://ui.perfetto.dev).
+# Gdy pomiary są wyłączone, metody nie są opakowywane - zero narzutu.
+import os
+import json
+import time
+import atexit
+import inspect
+import threading
+import functools
+
+DEFAULT_TRACE_PATH = os.path.join(os.path.expanduser("~/Tysiac_Manager"), "trace.json")
+SQL_TEXT_LIMIT = 200
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = []
+        self.thread_names = {}
+        # Ostatni pomiar każdej sekcji: nazwa -> (start, koniec, liczba SQL) - dla nakładki w oknie
+        self.last = {}
+        self.local = threading.local()
+        self.t0 = time.perf_counter()
+        self.pid = os.getpid()
+
+    def enable(self, path=None):
+        if self.enabled: return
+        self.enabled = True
+        self.path = path or DEFAULT_TRACE_PATH
+        atexit.register(self.save)
+
+    def now_us(self):
+        return (time.perf_counter() - self.t0) * 1e6
+
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+            thread = threading.current_thread()
+            self.thread_names[thread.ident] = thread.name
+        return stack
+
+    def begin(self, name):
+        self.finish_sql()
+        frame = [name, self.now_us(), 0]  # nazwa, start, liczba SQL
+        self.stack().append(frame)
+        return frame
+
+    def end(self, frame):
+        self.finish_sql()
+        end = self.now_us()
+        stack = self.stack()
+        stack.pop()
+        name, start, sql_count = frame
+        if stack: stack[-1][2] += sql_count
+        self.events.append({'name': name, 'cat': 'span', 'ph': 'X', 'ts': start, 'dur': end - start,
+                            'pid': self.pid, 'tid': threading.get_ident(), 'args': {'sql': sql_count}})
+        self.last[name] = (start, end, sql_count)
+
+    # --- SQL (sqlite3.Connection.set_trace_callback) ---
+    def watch_connection(self, conn):
+        if not self.enabled: return
+        conn.set_trace_callback(self.on_sql)
+
+    def on_sql(self, statement):
+        # Callback dostaje tylko tekst - czas instrukcji liczymy do następnej instrukcji
+        # albo do końca sekcji (górne oszacowanie, razem z pobieraniem wierszy)
+        self.finish_sql()
+        stack = self.stack()
+        if stack: stack[-1][2] += 1
+        self.local.pending_sql = (statement, self.now_us())
+
+    def finish_sql(self):
+        pending = getattr(self.local, "pending_sql", None)
+        if pending is None: return
+        self.local.pending_sql = None
+        statement, start = pending
+        text = " ".join(statement.split())
+        self.events.append({'name': text.split(" ", 1)[0].upper(), 'cat': 'sql', 'ph': 'X', 'ts': start,
+                            'dur': self.now_us() - start, 'pid': self.pid, 'tid': threading.get_ident(),
+                            'args': {'sql': text[:SQL_TEXT_LIMIT]}})
+
+    # --- Opakowywanie metod ---
+    def instrument(self, cls, names, prefix=None):
+        prefix = prefix or cls.__name__
+        for name in names:
+            # Atrybut bez rozwiązywania deskryptora - staticmethod / classmethod zostają tego samego typu
+            method = inspect.getattr_static(cls, name)
+            if isinstance(method, (staticmethod, classmethod)):
+                setattr(cls, name, type(method)(self.wrap(method.__func__, f"{prefix}.{name}")))
+            else:
+                setattr(cls, name, self.wrap(method, f"{prefix}.{name}"))
+
+    def wrap(self, fn, name):
+        tracer = self
+
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            frame = tracer.begin(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.end(frame)
+        return traced
+
+    def save(self, path=None):
+        if not self.enabled: return None
+        path = path or self.path
+        meta = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': tname}}
+                for tid, tname in self.thread_names.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': meta + list(self.events), 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+TRACER = Tracer()